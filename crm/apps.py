@@ -3,3 +3,13 @@ from django.apps import AppConfig
 class CrmConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'crm'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .instrumentation import install_query_recorder
+        from .phones import install_phone_match
+
+        connection_created.connect(install_query_recorder)
+        connection_created.connect(install_phone_match)
@@ -2,6 +2,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'crm.settings')
+# Read by crm/urls.py, which loads after this, when settings.GRAPHQL_ASYNC is None
+os.environ.setdefault('CRM_GRAPHQL_ASYNC', '1')
 application = get_asgi_application()
 import os
 from django.core.asgi import get_asgi_application
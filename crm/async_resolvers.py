@@ -0,0 +1,118 @@
+import functools
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import SyncToAsync
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import QuerySet
+from django.db.models.manager import BaseManager
+from graphene.relay.node import GlobalID
+from graphene.types.resolver import attr_resolver, dict_or_attr_resolver
+from graphene_django.fields import DjangoListField
+from graphene_django.types import DjangoObjectType
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Resolvers that only read attributes of an already-loaded object
+_PURE_RESOLVERS = (
+    dict_or_attr_resolver,
+    attr_resolver,
+    GlobalID.id_resolver,
+    DjangoObjectType.resolve_id,
+)
+
+
+def executor():
+    """The bounded pool sync resolvers run on during async execution.
+
+    Each worker thread keeps its own database connection, so
+    ``GRAPHQL_ASYNC_THREADS`` also caps the connections the pool opens.
+    They are recycled around every task (see ``run_in_pool``).
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "GRAPHQL_ASYNC_THREADS", 8),
+                thread_name_prefix="graphql-resolver",
+            )
+    return _executor
+
+
+def _pool_task(func, *args, **kwargs):
+    # No request_started/finished fires on pool threads, so apply CONN_MAX_AGE and
+    # drop broken connections here, as Django does around each request
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def run_in_pool(func, *args, **kwargs):
+    """Run sync ``func`` on the resolver pool; returns an awaitable.
+
+    ``SyncToAsync`` copies the caller's context variables (query metrics, read
+    routing) into the pool thread.
+    """
+    task = SyncToAsync(_pool_task, thread_sensitive=False, executor=executor())
+    return task(func, *args, **kwargs)
+
+
+def executing_async(info):
+    return getattr(info.context, "graphql_async", False)
+
+
+def async_capable(resolver):
+    """Mark a resolver that is safe to call on the event loop.
+
+    It must not touch the database itself, returning an awaitable instead
+    (see ``executing_async``) whenever it would have to.
+    """
+    resolver.async_capable = True
+    return resolver
+
+
+def _unwrap(resolver):
+    while isinstance(resolver, functools.partial):
+        resolver = resolver.func
+    return getattr(resolver, "__func__", resolver)
+
+
+def _runs_inline(resolver):
+    func = _unwrap(resolver)
+    if func is _unwrap(DjangoListField.list_resolver):
+        # Related-list wrapper: only as blocking as the resolver it wraps
+        return any(getattr(_unwrap(arg), "async_capable", False) for arg in resolver.args)
+    return (
+        func in _PURE_RESOLVERS
+        or getattr(func, "async_capable", False)
+        or inspect.iscoroutinefunction(func)
+    )
+
+
+def _resolve_in_thread(next_, root, info, args):
+    result = next_(root, info, **args)
+    # Evaluate lazy querysets here; iterating them on the event loop would hit the ORM
+    if isinstance(result, BaseManager):
+        result = result.all()
+    if isinstance(result, QuerySet):
+        result = list(result)
+    return result
+
+
+class ThreadedResolverMiddleware:
+    """Run sync resolvers on the resolver pool while the executor stays async.
+
+    Attribute reads and ``async_capable`` resolvers are called inline, so only
+    resolvers that may query the database pay for a thread hop, and sibling
+    fields (e.g. several root fields) resolve concurrently.
+    """
+
+    def resolve(self, next_, root, info, **args):
+        if _runs_inline(next_):
+            return next_(root, info, **args)
+        return run_in_pool(_resolve_in_thread, next_, root, info, args)
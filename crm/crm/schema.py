@@ -29,12 +29,8 @@ class UpdateLowStockProducts(graphene.Mutation):
 
     @classmethod
     def mutate(cls, root, info, increment_by=10, threshold=10):
-        to_update = Product.objects.filter(stock__lt=threshold)
-        updated = []
-        for p in to_update:
-            p.stock = (p.stock or 0) + increment_by
-            p.save(update_fields=["stock"])
-            updated.append(p)
+        # One set-based UPDATE instead of a save() per product
+        updated = Product.objects.restock_below(threshold, increment_by)
         msg = f"Updated {len(updated)} low-stock products"
         return UpdateLowStockProducts(ok=True, message=msg, updated_products=updated)
 
@@ -1,6 +1,6 @@
 from django.utils import timezone
-from gql.transport.requests import RequestsHTTPTransport
-from gql import gql, Client
+
+from crm.jobs import execute_job_query
 
 
 def _timestamp():
@@ -9,11 +9,9 @@ def _timestamp():
 
 def log_crm_heartbeat():
     ts = _timestamp()
-    # Optionally query GraphQL hello to verify endpoint responsiveness
+    # Query GraphQL hello to verify the schema responds
     try:
-        transport = RequestsHTTPTransport(url="http://localhost:8000/graphql", verify=False)
-        client = Client(transport=transport, fetch_schema_from_transport=False)
-        result = client.execute(gql("query { hello }"))
+        result = execute_job_query("query { hello }")
         hello = result.get('hello', 'unknown')
     except Exception:
         hello = 'unavailable'
@@ -22,7 +20,6 @@ def log_crm_heartbeat():
 
 
 def update_low_stock():
-    import requests
     query = '''
     mutation UpdateLowStock($inc: Int, $th: Int){
       updateLowStockProducts(incrementBy: $inc, threshold: $th){
@@ -35,11 +32,27 @@ def update_low_stock():
     variables = {"inc": 10, "th": 10}
 
     try:
-        resp = requests.post('http://localhost:8000/graphql', json={'query': query, 'variables': variables})
-        data = resp.json()
+        data = {"data": execute_job_query(query, variables)}
     except Exception as e:
         data = {"error": str(e)}
 
     ts = _timestamp()
     with open('/tmp/low_stock_updates_log.txt', 'a') as f:
         f.write(f"{ts} {data}\n")
+
+
+def reconcile_dashboard_counters():
+    # Corrects any drift in the signal-maintained counters (bulk writes, raw SQL)
+    from crm.stats.models import DashboardCounter
+    values = DashboardCounter.objects.reconcile()
+    ts = _timestamp()
+    with open('/tmp/crm_counters_log.txt', 'a') as f:
+        f.write(f"{ts} Reconciled counters: {values}\n")
+
+
+def refresh_sales_rollups():
+    from crm.stats.rollups import refresh_sales_rollups as refresh
+    result = refresh()
+    ts = _timestamp()
+    with open('/tmp/crm_rollups_log.txt', 'a') as f:
+        f.write(f"{ts} Refreshed sales rollups from {result['from']}: {result['rows']} rows\n")
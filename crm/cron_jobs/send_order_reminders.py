@@ -1,80 +1,42 @@
-import sys
-from datetime import datetime
-from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
-
-
-def main():
-    transport = RequestsHTTPTransport(url="http://localhost:8000/graphql", verify=False)
-    client = Client(transport=transport, fetch_schema_from_transport=False)
-
-    query = gql(
-        """
-        query Recent($days: Int){
-          ordersRecent(days: $days){
-            id
-            customer { email }
-          }
-        }
-        """
-    )
-
-    result = client.execute(query, variable_values={"days": 7})
-    orders = result.get("ordersRecent", [])
-    ts = datetime.utcnow().strftime('%d/%m/%Y-%H:%M:%S')
-    with open('/tmp/order_reminders_log.txt', 'a') as f:
-        for o in orders:
-            f.write(f"{ts} Reminder -> order {o['id']} to {o['customer']['email']}\n")
-
-    print("Order reminders processed!")
-
-
-if __name__ == "__main__":
-    main()
 #!/usr/bin/env python3
+"""Remind customers about their pending orders from the last week.
+
+Runs the batched pipeline in ``crm.reminders`` in-process: pending orders are
+paged with a cursor, folded into one reminder per customer, sent concurrently
+and recorded so a rerun only picks up orders that were not reminded yet.
+"""
+import argparse
+import os
 import sys
-from datetime import timedelta
-from datetime import datetime, timezone as dt_timezone
-from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
 
-LOG_FILE = "/tmp/order_reminders_log.txt"
-ENDPOINT = "http://localhost:8000/graphql"
-
-def timestamp():
-    return datetime.now(dt_timezone.utc).strftime('%d/%m/%Y-%H:%M:%S')
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
 def main():
-    transport = RequestsHTTPTransport(url=ENDPOINT, verify=True, retries=3)
-    client = Client(transport=transport, fetch_schema_from_transport=False)
-
-    query = gql(
-        """
-        query PendingOrdersLastWeek {
-          pendingOrdersLastWeek {
-            id
-            customer { email }
-          }
-        }
-        """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rate", type=float, default=None, help="Max reminders per second")
+    args = parser.parse_args()
+
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "crm.settings")
+    import django
+
+    django.setup()
+    from crm.reminders import send_order_reminders
+
+    stats = send_order_reminders(
+        days=args.days,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        rate=args.rate,
+    )
+    print(
+        f"Order reminders processed! {stats['customers']} customers, "
+        f"{stats['orders']} orders, {stats['failed']} failed"
     )
-
-    try:
-        result = client.execute(query)
-        items = result.get("pendingOrdersLastWeek", [])
-    except Exception as e:
-        items = []
-        with open(LOG_FILE, 'a') as f:
-            f.write(f"{timestamp()} Error fetching orders: {e}\n")
-
-    with open(LOG_FILE, 'a') as f:
-        for o in items:
-            cid = o.get('id')
-            email = (o.get('customer') or {}).get('email')
-            f.write(f"{timestamp()} Reminder -> order_id={cid}, customer_email={email}\n")
-
-    print("Order reminders processed!")
 
 
 if __name__ == "__main__":
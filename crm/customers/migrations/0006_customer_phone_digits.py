@@ -0,0 +1,40 @@
+# Generated by Django 4.2.15 on 2026-10-18 16:45
+
+from django.db import migrations, models
+
+from crm.customers.models import normalize_phone
+
+
+def backfill_phone_digits(apps, schema_editor):
+    Customer = apps.get_model('customers', 'Customer')
+    batch = []
+    for customer in Customer.objects.exclude(phone__isnull=True).only('pk', 'phone').iterator():
+        customer.phone_digits = normalize_phone(customer.phone)
+        batch.append(customer)
+        if len(batch) >= 500:
+            Customer.objects.bulk_update(batch, ['phone_digits'])
+            batch = []
+    if batch:
+        Customer.objects.bulk_update(batch, ['phone_digits'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0005_customer_search'),
+    ]
+
+    operations = [
+        # Nullable so SQLite adds the column in place instead of remaking the table,
+        # which would drop the customers_customer_fts triggers
+        migrations.AddField(
+            model_name='customer',
+            name='phone_digits',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True),
+        ),
+        migrations.RunPython(backfill_phone_digits, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['phone_digits'], name='customer_phone_digits_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.core.validators import RegexValidator
 
 phone_validator = RegexValidator(
@@ -7,15 +8,40 @@ phone_validator = RegexValidator(
 )
 
 
+def normalize_phone(phone):
+    """Return ``phone`` as its digits, keeping a leading ``+``; None when it has none."""
+    if not phone:
+        return None
+    digits = "".join(ch for ch in phone if ch.isdigit())
+    if not digits:
+        return None
+    return "+" + digits if phone.lstrip().startswith("+") else digits
+
+
 class Customer(models.Model):
     # Allow blank name for backward compatibility with pre-existing rows
     name = models.CharField(max_length=255, blank=True, default="")
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=32, blank=True, null=True, validators=[phone_validator])
+    # normalize_phone(phone), kept in step by save(); indexed for phone lookups
+    phone_digits = models.CharField(max_length=32, blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at"], name="customer_created_at_idx"),
+            # Case-insensitive email duplicate checks: LOWER(email) = / IN email.lower()
+            models.Index(Lower("email"), name="customer_email_lower_idx"),
+            models.Index(fields=["phone_digits"], name="customer_phone_digits_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.phone_digits = normalize_phone(self.phone)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "phone" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "phone_digits"}
+        super().save(*args, **kwargs)
 
     def __str__(self):  # pragma: no cover - trivial
         return self.email
@@ -0,0 +1,102 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from crm.customers.models import Customer, normalize_phone
+from crm.orders.models import Order
+from crm.products.models import Product
+from crm.response_cache import invalidate
+from crm.stats.models import DashboardCounter
+
+FIRST_NAMES = (
+    "Ada", "Alan", "Grace", "Linus", "Ken", "Barbara", "Edsger", "Margaret", "Dennis", "Frances",
+)
+LAST_NAMES = ("Lovelace", "Turing", "Hopper", "Torvalds", "Thompson", "Liskov", "Dijkstra")
+PRODUCT_WORDS = ("Laptop", "Phone", "Monitor", "Keyboard", "Mouse", "Headset", "Dock", "Tablet")
+STATUSES = ("pending", "pending", "completed", "shipped", "cancelled")
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def generate(customers=1000, products=100, orders=5000, products_per_order=(1, 4),
+             days=365, seed=0, batch_size=2000, stdout=None):
+    """Insert synthetic customers, products and orders with ``bulk_create``.
+
+    Rows are derived from ``seed`` so two runs with the same arguments build
+    the same data set (emails are made unique per run). Signals do not fire for
+    bulk inserts, so order totals and phone digits are filled in here and the
+    dashboard counters are reconciled at the end. Returns the row counts.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    run = f"{seed}-{now.strftime('%Y%m%d%H%M%S%f')}"
+    low, high = products_per_order
+
+    def log(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    with transaction.atomic():
+        customer_rows = []
+        for i in range(customers):
+            phone = f"+1555{rng.randrange(10 ** 7):07d}"
+            customer_rows.append(Customer(
+                name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                email=f"customer{i}-{run}@example.com",
+                phone=phone,
+                phone_digits=normalize_phone(phone),
+            ))
+        created = Customer.objects.bulk_create(customer_rows, batch_size=batch_size)
+        customer_ids = [c.pk for c in created]
+        log(f"{len(customer_ids)} customers")
+
+        product_rows = [
+            Product(
+                name=f"{rng.choice(PRODUCT_WORDS)} {i}",
+                price=Decimal(rng.randrange(100, 200000)) / 100,
+                stock=rng.randrange(0, 500),
+            )
+            for i in range(products)
+        ]
+        created = Product.objects.bulk_create(product_rows, batch_size=batch_size)
+        prices = {p.pk: p.price for p in created}
+        product_ids = list(prices)
+        log(f"{len(product_ids)} products")
+
+        through = Order.products.through
+        placed = 0
+        for chunk in _chunks(range(orders), batch_size):
+            picks = [
+                rng.sample(product_ids, min(rng.randint(low, high), len(product_ids)))
+                for _ in chunk
+            ]
+            order_rows = [
+                Order(
+                    customer_id=rng.choice(customer_ids),
+                    order_date=now - timedelta(seconds=rng.randrange(days * 86400)),
+                    status=rng.choice(STATUSES),
+                    total_amount=sum((prices[pk] for pk in chosen), Decimal("0")),
+                )
+                for chosen in picks
+            ]
+            Order.objects.bulk_create(order_rows)
+            through.objects.bulk_create(
+                [
+                    through(order_id=order.pk, product_id=pk)
+                    for order, chosen in zip(order_rows, picks)
+                    for pk in chosen
+                ],
+                batch_size=batch_size,
+            )
+            placed += len(order_rows)
+        log(f"{placed} orders")
+
+        DashboardCounter.objects.reconcile()
+        invalidate("Customer", "Product", "Order")
+    return {"customers": len(customer_ids), "products": len(product_ids), "orders": placed}
@@ -0,0 +1,196 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+STICKY_COOKIE = "crm_primary"
+
+DEFAULTS = {
+    "PRIMARY": DEFAULT_DB_ALIAS,
+    "REPLICAS": [],
+    # After a write, the client's reads stay on the primary this long (cookie lifetime)
+    "STICKY_SECONDS": 10,
+    # A replica's probe result is reused this long
+    "HEALTH_CHECK_INTERVAL": 5,
+    # Fails on an unreachable replica and on one that was never populated
+    "HEALTH_CHECK_QUERY": "SELECT 1 FROM django_migrations LIMIT 1",
+}
+
+
+def routing_config():
+    return {**DEFAULTS, **getattr(settings, "DATABASE_ROUTING", {})}
+
+
+class RoutingState:
+    """Where the reads of one request (or job) go.
+
+    Shared by every thread and task working for the request, so a write made
+    on the resolver pool pins the rest of the request to the primary too.
+    """
+
+    def __init__(self, primary=False):
+        self.primary = primary
+        self.wrote = False
+        self.replica = None
+
+
+_state = ContextVar("crm_db_routing", default=None)
+
+
+@contextmanager
+def replica_reads(primary=False):
+    """Send this block's reads to a replica until it writes; ``primary`` pins it from the start.
+
+    Outside such a block everything runs on the primary.
+    """
+    state = RoutingState(primary=primary)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def pin_primary():
+    """Read from the primary for the rest of the current request (read-your-writes)."""
+    state = _state.get()
+    if state is not None:
+        state.primary = state.wrote = True
+
+
+def pinned_to_primary():
+    state = _state.get()
+    return state is not None and state.primary
+
+
+def read_from_replica():
+    """Whether the current request has read anything from a replica."""
+    state = _state.get()
+    return state is not None and state.replica not in (None, routing_config()["PRIMARY"])
+
+
+class ReplicaHealth:
+    """Probe results per replica alias, reused for ``HEALTH_CHECK_INTERVAL`` seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked = {}  # alias -> (healthy, monotonic time)
+
+    def is_healthy(self, alias):
+        interval = routing_config()["HEALTH_CHECK_INTERVAL"]
+        with self._lock:
+            healthy, checked = self._checked.get(alias, (None, 0.0))
+        if healthy is not None and time.monotonic() - checked < interval:
+            return healthy
+        healthy = self.probe(alias)
+        with self._lock:
+            self._checked[alias] = (healthy, time.monotonic())
+        return healthy
+
+    @staticmethod
+    def probe(alias):
+        connection = connections[alias]
+        try:
+            # Drops a persistent connection that went stale (CONN_HEALTH_CHECKS)
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute(routing_config()["HEALTH_CHECK_QUERY"])
+                cursor.fetchall()
+            return True
+        except DatabaseError:
+            connection.close()
+            return False
+
+    def reset(self):
+        with self._lock:
+            self._checked.clear()
+
+
+replica_health = ReplicaHealth()
+
+
+def healthy_replicas():
+    return [alias for alias in routing_config()["REPLICAS"] if replica_health.is_healthy(alias)]
+
+
+class PrimaryReplicaRouter:
+    """Reads inside ``replica_reads`` go to one healthy replica per request.
+
+    Everything else uses the primary: writes (which also pin the request's
+    later reads to it), reads inside a transaction on the primary, reads of
+    objects loaded from it, and any read when no replica is healthy.
+    """
+
+    def db_for_read(self, model, **hints):
+        config = routing_config()
+        primary = config["PRIMARY"]
+        state = _state.get()
+        if state is None or state.primary or not config["REPLICAS"]:
+            return primary
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db is not None:
+            return instance._state.db
+        if connections[primary].in_atomic_block:
+            return primary
+        if state.replica is None:
+            # One replica per request keeps its pages and counts consistent
+            state.replica = random.choice(healthy_replicas() or [primary])
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return routing_config()["PRIMARY"]
+
+    def allow_relation(self, obj1, obj2, **hints):
+        config = routing_config()
+        aliases = {config["PRIMARY"], *config["REPLICAS"]}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema (and rows) from the primary
+        return db not in routing_config()["REPLICAS"]
+
+
+class ReplicaRoutingMiddleware:
+    """Open a ``replica_reads`` scope per request and make it sticky after writes.
+
+    A request that writes sets a short-lived cookie, and requests carrying
+    it read from the primary, so a client sees its own changes on the next
+    request even while the replicas catch up.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with replica_reads(primary=STICKY_COOKIE in request.COOKIES) as state:
+            response = self.get_response(request)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        with replica_reads(primary=STICKY_COOKIE in request.COOKIES) as state:
+            response = await self.get_response(request)
+        return self.finish(response, state)
+
+    @staticmethod
+    def finish(response, state):
+        if state.wrote:
+            response.set_cookie(
+                STICKY_COOKIE, "1", max_age=routing_config()["STICKY_SECONDS"],
+                httponly=True, samesite="Lax",
+            )
+        return response
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from graphene_django.settings import graphene_settings
+from graphql import GraphQLError, OperationDefinitionNode, parse, validate
+
+APQ_CACHE_PREFIX = "crm:apq:"
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+class DocumentCache:
+    """Thread-safe LRU of parsed *and validated* DocumentNodes.
+
+    Keyed by (query sha256, schema, validation rules) so views with different
+    rules never share an entry. Only documents that passed validation are kept.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            document = self._entries.get(key)
+            if document is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return document
+
+    def set(self, key, document):
+        with self._lock:
+            self._entries[key] = document
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+document_cache = DocumentCache(getattr(settings, "GRAPHQL_DOCUMENT_CACHE_SIZE", 256))
+
+
+def get_document(schema, query, validation_rules=None, digest=None):
+    """Return (document, errors) for ``query``, parsing and validating at most once.
+
+    Raises GraphQLError on syntax errors, like ``graphql.parse``.
+    """
+    rules = tuple(validation_rules or ())
+    key = (digest or query_hash(query), id(schema), rules)
+    document = document_cache.get(key)
+    if document is not None:
+        return document, []
+    document = parse(query)
+    errors = validate(
+        schema, document, list(rules) or None, graphene_settings.MAX_VALIDATION_ERRORS
+    )
+    if not errors:
+        document_cache.set(key, document)
+    return document, errors
+
+
+class PersistedQueryStore:
+    """Hash -> query text for automatic persisted queries.
+
+    Reads the allowlist file written by ``manage.py persist_queries`` and falls
+    back to queries registered at runtime through Django's cache.
+    """
+
+    def __init__(self):
+        self._allowlist = None
+        self._operation_names = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return getattr(settings, "GRAPHQL_PERSISTED_QUERIES_FILE", None)
+
+    @property
+    def allowlist(self):
+        if self._allowlist is None:
+            with self._lock:
+                if self._allowlist is None:
+                    self._allowlist = self.read_file(self.path)
+        return self._allowlist
+
+    @staticmethod
+    def read_file(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (TypeError, FileNotFoundError):
+            return {}
+
+    @property
+    def operation_names(self):
+        """Names of the operations defined by allowlisted queries."""
+        if self._operation_names is None:
+            names = set()
+            for query in self.allowlist.values():
+                try:
+                    document = parse(query)
+                except GraphQLError:
+                    continue
+                names.update(
+                    definition.name.value
+                    for definition in document.definitions
+                    if isinstance(definition, OperationDefinitionNode) and definition.name
+                )
+            self._operation_names = frozenset(names)
+        return self._operation_names
+
+    def reload(self):
+        self._allowlist = None
+        self._operation_names = None
+
+    def get(self, digest):
+        query = self.allowlist.get(digest)
+        if query is None:
+            query = cache.get(APQ_CACHE_PREFIX + digest)
+        return query
+
+    def register(self, digest, query):
+        if digest not in self.allowlist:
+            cache.set(APQ_CACHE_PREFIX + digest, query, timeout=None)
+
+
+persisted_queries = PersistedQueryStore()
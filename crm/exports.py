@@ -0,0 +1,85 @@
+import csv
+import json
+
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+
+from crm.filters import OrderFilter
+from crm.orders.models import Order
+from crm.products.models import Product
+
+# Orders per fetch; each chunk costs one extra query for its products
+CHUNK_SIZE = 2000
+
+COLUMNS = (
+    "id",
+    "order_date",
+    "status",
+    "total_amount",
+    "customer_id",
+    "customer_name",
+    "customer_email",
+    "product_ids",
+    "product_names",
+)
+
+# Filters that join the order products and can repeat an order
+_MULTI_VALUED = ("product_name", "product_id")
+
+
+def filter_orders(params):
+    """Return ``(queryset, errors)`` for OrderFilter ``params`` (snake_case or camelCase)."""
+    data = {to_snake_case(key): value for key, value in params.items()}
+    filterset = OrderFilter(data=data, queryset=Order.objects.all())
+    if not filterset.is_valid():
+        return None, filterset.errors.get_json_data()
+    queryset = filterset.qs
+    if any(filterset.form.cleaned_data.get(name) not in (None, "") for name in _MULTI_VALUED):
+        queryset = queryset.distinct()
+    return queryset, None
+
+
+def iter_orders(queryset, chunk_size=CHUNK_SIZE):
+    """Yield one plain dict per order, holding at most ``chunk_size`` orders in memory."""
+    queryset = (
+        queryset.select_related("customer")
+        .only(
+            "id", "order_date", "status", "total_amount",
+            "customer__id", "customer__name", "customer__email",
+        )
+        .prefetch_related(
+            Prefetch("products", queryset=Product.objects.only("id", "name").order_by("pk"))
+        )
+    )
+    for order in queryset.iterator(chunk_size=chunk_size):
+        products = order.products.all()
+        yield {
+            "id": order.pk,
+            "order_date": order.order_date.isoformat(),
+            "status": order.status,
+            "total_amount": str(order.total_amount),
+            "customer_id": order.customer_id,
+            "customer_name": order.customer.name,
+            "customer_email": order.customer.email,
+            "product_ids": [p.pk for p in products],
+            "product_names": [p.name for p in products],
+        }
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, separators=(",", ":")) + "\n"
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        row = dict(row, product_ids=";".join(map(str, row["product_ids"])),
+                   product_names=";".join(row["product_names"]))
+        yield writer.writerow([row[column] for column in COLUMNS])
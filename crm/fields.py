@@ -0,0 +1,28 @@
+from graphene_django.filter import DjangoFilterConnectionField
+from promise import Promise
+
+from .loaders import get_loaders
+
+
+class BatchedConnectionField(DjangoFilterConnectionField):
+    """Filter connection field that queues the page's rows with the request loaders.
+
+    Nested relations on the returned nodes then resolve in one query per
+    relation for the whole page instead of one query per row.
+    """
+
+    @classmethod
+    def connection_resolver(cls, resolver, connection, default_manager, queryset_resolver,
+                            max_limit, enforce_first_or_last, root, info, **args):
+        result = super().connection_resolver(
+            resolver, connection, default_manager, queryset_resolver,
+            max_limit, enforce_first_or_last, root, info, **args
+        )
+
+        def prime(conn):
+            get_loaders(info).prime(edge.node for edge in conn.edges)
+            return conn
+
+        if Promise.is_thenable(result):
+            return Promise.resolve(result).then(prime)
+        return prime(result)
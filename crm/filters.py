@@ -2,6 +2,8 @@ import django_filters as filters
 from crm.customers.models import Customer
 from crm.products.models import Product
 from crm.orders.models import Order
+from crm.phones import filter_phone
+from crm.search import search
 
 
 class CustomerFilter(filters.FilterSet):
@@ -10,6 +12,7 @@ class CustomerFilter(filters.FilterSet):
     created_at_gte = filters.DateTimeFilter(field_name="created_at", lookup_expr="gte")
     created_at_lte = filters.DateTimeFilter(field_name="created_at", lookup_expr="lte")
     phone_pattern = filters.CharFilter(method="filter_phone_pattern")
+    search = filters.CharFilter(method="filter_search")
     order_by = filters.OrderingFilter(
         fields=(
             ("name", "name"),
@@ -20,12 +23,15 @@ class CustomerFilter(filters.FilterSet):
 
     def filter_phone_pattern(self, queryset, name, value):  # noqa: ARG002
         if value:
-            return queryset.filter(phone__regex=value)
+            return filter_phone(queryset, value)
         return queryset
 
+    def filter_search(self, queryset, name, value):  # noqa: ARG002
+        return search(queryset, value)
+
     class Meta:
         model = Customer
-    fields = ["name", "email", "created_at_gte", "created_at_lte", "phone_pattern"]
+        fields = ["name", "email", "created_at_gte", "created_at_lte", "phone_pattern", "search"]
 
 
 class ProductFilter(filters.FilterSet):
@@ -34,6 +40,7 @@ class ProductFilter(filters.FilterSet):
     price_lte = filters.NumberFilter(field_name="price", lookup_expr="lte")
     stock_gte = filters.NumberFilter(field_name="stock", lookup_expr="gte")
     stock_lte = filters.NumberFilter(field_name="stock", lookup_expr="lte")
+    search = filters.CharFilter(method="filter_search")
     order_by = filters.OrderingFilter(
         fields=(
             ("name", "name"),
@@ -42,9 +49,12 @@ class ProductFilter(filters.FilterSet):
         )
     )
 
+    def filter_search(self, queryset, name, value):  # noqa: ARG002
+        return search(queryset, value)
+
     class Meta:
         model = Product
-    fields = ["name", "price_gte", "price_lte", "stock_gte", "stock_lte"]
+        fields = ["name", "price_gte", "price_lte", "stock_gte", "stock_lte", "search"]
 
 
 class OrderFilter(filters.FilterSet):
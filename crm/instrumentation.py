@@ -0,0 +1,299 @@
+import bisect
+import inspect
+import json
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from crm.documents import persisted_queries
+
+DEBUG_HEADER = "HTTP_X_GRAPHQL_DEBUG"
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+RESOLVER_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+# Label for operation names past GRAPHQL_METRICS_MAX_OPERATIONS
+OTHER = "other"
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label value, Prometheus style."""
+
+    def __init__(self, name, help_text, label, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, label_value, value):
+        with self._lock:
+            counts, total = self._series.get(label_value, ([0] * (len(self.buckets) + 1), 0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._series[label_value] = (counts, total + value)
+
+    def snapshot(self):
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for value, (counts, total) in sorted(self.snapshot().items()):
+            label = f'{self.label}="{value}"'
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {total}")
+            lines.append(f"{self.name}_count{{{label}}} {cumulative}")
+        return "\n".join(lines)
+
+
+REQUEST_DURATION = Histogram(
+    "crm_graphql_request_duration_seconds", "GraphQL request wall time", "operation",
+    REQUEST_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "crm_graphql_request_queries", "SQL queries per GraphQL request", "operation", QUERY_BUCKETS
+)
+REQUEST_SQL_DURATION = Histogram(
+    "crm_graphql_request_sql_seconds", "SQL time per GraphQL request", "operation", REQUEST_BUCKETS
+)
+RESOLVER_DURATION = Histogram(
+    "crm_graphql_resolver_seconds", "Time per field resolver, per request", "field",
+    RESOLVER_BUCKETS,
+)
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_QUERIES, REQUEST_SQL_DURATION, RESOLVER_DURATION)
+
+
+class OperationLabels:
+    """Bounded set of operation names used as histogram labels.
+
+    Names from the persisted query allowlist are always kept, and so are the
+    first ``GRAPHQL_METRICS_MAX_OPERATIONS`` other names seen. Later names are
+    reported as ``other``, so clients cannot grow the registry without limit.
+    """
+
+    FIXED = ("anonymous", "unknown")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = set()
+
+    def label(self, name):
+        if name in self.FIXED or name in persisted_queries.operation_names:
+            return name
+        limit = getattr(settings, "GRAPHQL_METRICS_MAX_OPERATIONS", 100)
+        with self._lock:
+            if name in self._seen:
+                return name
+            if len(self._seen) < limit:
+                self._seen.add(name)
+                return name
+        return OTHER
+
+    def reset(self):
+        with self._lock:
+            self._seen.clear()
+
+
+operation_labels = OperationLabels()
+
+
+class RequestMetrics:
+    """SQL and resolver timings collected for one request (possibly from several threads)."""
+
+    def __init__(self):
+        self.operation = None
+        self.queries = 0
+        self.sql_time = 0.0
+        self.fields = defaultdict(lambda: [0, 0.0, 0.0])  # key -> [calls, total, max]
+        self._lock = threading.Lock()
+
+    def record_query(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.queries += 1
+                self.sql_time += elapsed
+
+    def record_field(self, key, elapsed):
+        with self._lock:
+            stats = self.fields[key]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+
+    def as_extension(self, duration):
+        fields = sorted(self.fields.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "operation": self.operation,
+            "durationMs": round(duration * 1000, 3),
+            "queries": self.queries,
+            "sqlMs": round(self.sql_time * 1000, 3),
+            "resolvers": [
+                {
+                    "field": key,
+                    "calls": calls,
+                    "totalMs": round(total * 1000, 3),
+                    "maxMs": round(peak * 1000, 3),
+                }
+                for key, (calls, total, peak) in fields
+            ],
+        }
+
+    def observe(self, duration):
+        operation = operation_labels.label(self.operation or "unknown")
+        REQUEST_DURATION.observe(operation, duration)
+        REQUEST_QUERIES.observe(operation, self.queries)
+        REQUEST_SQL_DURATION.observe(operation, self.sql_time)
+        for key, (_, total, _) in self.fields.items():
+            RESOLVER_DURATION.observe(key, total)
+
+
+# Metrics of the request being served; asgiref copies context variables into
+# sync_to_async threads, so queries on the resolver pool are counted too
+_current = ContextVar("crm_request_metrics", default=None)
+
+
+def get_metrics(context):
+    return getattr(context, "crm_metrics", None)
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.record_query(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """``connection_created`` receiver: one permanent wrapper per connection."""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+class ResolverTimingMiddleware:
+    """Graphene middleware timing every resolver into the request's metrics."""
+
+    def resolve(self, next_, root, info, **args):
+        metrics = get_metrics(info.context)
+        if metrics is None:
+            return next_(root, info, **args)
+        if metrics.operation is None:
+            metrics.operation = info.operation.name.value if info.operation.name else "anonymous"
+        key = f"{info.parent_type.name}.{info.field_name}"
+        started = time.perf_counter()
+        result = next_(root, info, **args)
+        if inspect.isawaitable(result):
+            return self._timed(result, metrics, key, started)
+        metrics.record_field(key, time.perf_counter() - started)
+        return result
+
+    @staticmethod
+    async def _timed(awaitable, metrics, key, started):
+        try:
+            return await awaitable
+        finally:
+            metrics.record_field(key, time.perf_counter() - started)
+
+
+class QueryMetricsMiddleware:
+    """Django middleware counting the SQL and wall time of GraphQL requests.
+
+    Results feed the process-wide histograms served by ``metrics_view``. With
+    an ``X-GraphQL-Debug`` header (and ``GRAPHQL_DEBUG_EXTENSIONS`` on) they are
+    also returned under ``extensions.metrics`` in the JSON response. Sync and
+    async capable, so it does not put ASGI requests back on a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = set(getattr(settings, "GRAPHQL_INSTRUMENTED_PATHS", ("/graphql",)))
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.path not in self.paths:
+            return self.get_response(request)
+        metrics, token, started = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        if request.path not in self.paths:
+            return await self.get_response(request)
+        metrics, token, started = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    @staticmethod
+    def start(request):
+        metrics = request.crm_metrics = RequestMetrics()
+        return metrics, _current.set(metrics), time.perf_counter()
+
+    def finish(self, request, response, metrics, started):
+        duration = time.perf_counter() - started
+        metrics.observe(duration)
+        if request.META.get(DEBUG_HEADER) and getattr(settings, "GRAPHQL_DEBUG_EXTENSIONS", False):
+            self.add_extension(response, metrics.as_extension(duration))
+        return response
+
+    @staticmethod
+    def add_extension(response, extension):
+        content_type = response.get("Content-Type", "")
+        if response.streaming or not content_type.startswith("application/json"):
+            return
+        try:
+            payload = json.loads(response.content)
+        except ValueError:
+            return
+        if isinstance(payload, dict):
+            payload.setdefault("extensions", {})["metrics"] = extension
+            response.content = json.dumps(payload)
+
+
+def _may_read_metrics(request):
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token and constant_time_compare(
+        request.META.get("HTTP_AUTHORIZATION", ""), f"Bearer {token}"
+    ):
+        return True
+    if request.META.get("REMOTE_ADDR") in getattr(settings, "INTERNAL_IPS", ()):
+        return True
+    user = getattr(request, "user", None)
+    return user is not None and user.is_active and user.is_staff
+
+
+def metrics_view(request):
+    """Prometheus text for staff users, ``INTERNAL_IPS`` and ``Bearer METRICS_TOKEN``."""
+    if not _may_read_metrics(request):
+        return HttpResponseForbidden()
+    body = "\n".join(histogram.render() for histogram in HISTOGRAMS) + "\n"
+    return HttpResponse(body, content_type="text/plain; version=0.0.4")
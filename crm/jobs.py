@@ -0,0 +1,78 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class JobQueryError(Exception):
+    """The GraphQL document ran but returned errors."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+def _job_request():
+    # Loaders and other per-request state hang off the context like in a web request
+    request = HttpRequest()
+    request.method = "POST"
+    return request
+
+
+def _execute_in_process(query, variables):
+    from crm.schema import schema
+
+    result = schema.execute(query, variables=variables, context_value=_job_request())
+    if result.errors:
+        raise JobQueryError([getattr(e, "message", str(e)) for e in result.errors])
+    return result.data
+
+
+def _http_session():
+    # One pooled keep-alive session per worker process instead of a client per run
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter, Retry
+
+            _session = requests.Session()
+            _session.mount("http://", HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.5)))
+            _session.mount("https://", HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.5)))
+    return _session
+
+
+def _execute_over_http(query, variables):
+    response = _http_session().post(
+        getattr(settings, "GRAPHQL_JOBS_ENDPOINT", "http://localhost:8000/graphql"),
+        json={"query": query, "variables": variables or {}},
+        timeout=30,
+    )
+    payload = response.json()
+    if payload.get("errors"):
+        raise JobQueryError([e.get("message", str(e)) for e in payload["errors"]])
+    return payload.get("data")
+
+
+def execute_job_query(query, variables=None):
+    """Run a GraphQL document for a cron/Celery job and return its ``data``.
+
+    Executes against the schema inside the worker process and falls back to
+    the pooled HTTP client when that fails to load or run (e.g. a worker
+    without database access); ``GRAPHQL_JOBS_IN_PROCESS = False`` always uses
+    HTTP. Raises ``JobQueryError`` on GraphQL errors, which are not retried.
+    """
+    if getattr(settings, "GRAPHQL_JOBS_IN_PROCESS", True):
+        try:
+            return _execute_in_process(query, variables)
+        except JobQueryError:
+            raise
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("In-process job query failed; retrying over HTTP", exc_info=True)
+    return _execute_over_http(query, variables)
@@ -0,0 +1,140 @@
+import threading
+from collections import defaultdict
+
+from crm.async_resolvers import executing_async, run_in_pool
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+from crm.products.models import Product
+
+
+def _related_ordering(field_name, model):
+    # Translate a model's Meta.ordering so it can be applied across a relation
+    ordering = []
+    for key in model._meta.ordering:
+        desc = key.startswith("-")
+        ordering.append(f"{'-' if desc else ''}{field_name}__{key.lstrip('-')}")
+    return ordering
+
+
+class BatchLoader:
+    """Synchronous DataLoader.
+
+    Keys queued for a page are fetched together on the first ``load`` miss, so
+    resolving a relation for every row of a page costs a single query.
+    """
+
+    def __init__(self, batch_load_fn, default=None):
+        self.batch_load_fn = batch_load_fn
+        self.default = default
+        self._cache = {}
+        self._queue = set()
+        # Resolver-pool threads share the request's loaders during async execution
+        self._lock = threading.RLock()
+
+    def queue(self, keys):
+        self._queue.update(k for k in keys if k is not None and k not in self._cache)
+
+    def prime(self, key, value):
+        self._cache.setdefault(key, value)
+
+    def loaded(self, key):
+        return key in self._cache
+
+    def load(self, key):
+        with self._lock:
+            if key not in self._cache:
+                self._queue.add(key)
+                self.dispatch()
+        value = self._cache.get(key)
+        if value is None and self.default is not None:
+            return self.default()
+        return value
+
+    def dispatch(self):
+        with self._lock:
+            keys = list(self._queue)
+            self._queue.clear()
+            if not keys:
+                return
+            results = self.batch_load_fn(keys)
+            for key in keys:
+                self._cache[key] = results.get(key)
+
+
+class Loaders:
+    """Per-request loaders for Order.customer, Order.products and Product.orders."""
+
+    def __init__(self):
+        self.customer = BatchLoader(self._load_customers)
+        self.order_products = BatchLoader(self._load_order_products, default=list)
+        self.product_orders = BatchLoader(self._load_product_orders, default=list)
+
+    def prime(self, instances):
+        for obj in instances:
+            if isinstance(obj, Order):
+                # Read through __dict__ so a deferred customer_id is not fetched row by row
+                self.customer.queue([obj.__dict__.get("customer_id")])
+                self.order_products.queue([obj.pk])
+            elif isinstance(obj, Product):
+                self.product_orders.queue([obj.pk])
+
+    def _load_customers(self, keys):
+        return Customer.objects.in_bulk(keys)
+
+    def _load_order_products(self, keys):
+        through = Order.products.through
+        rows = (
+            through.objects.filter(order_id__in=keys)
+            .select_related("product")
+            .order_by(*_related_ordering("product", Product))
+        )
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[row.order_id].append(row.product)
+        for products in grouped.values():
+            self.prime(products)
+        return grouped
+
+    def _load_product_orders(self, keys):
+        through = Order.products.through
+        rows = (
+            through.objects.filter(product_id__in=keys)
+            .select_related("order")
+            .order_by(*_related_ordering("order", Order))
+        )
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[row.product_id].append(row.order)
+        for orders in grouped.values():
+            self.prime(orders)
+        return grouped
+
+
+def prefetched(instance, name):
+    """Return the prefetched rows of relation ``name`` or None if it was not prefetched."""
+    cache = getattr(instance, "_prefetched_objects_cache", {})
+    if name in cache:
+        return list(cache[name])
+    return None
+
+
+def load(info, loader, key):
+    """``loader.load(key)``, moved to the resolver pool if it would query during async execution."""
+    if executing_async(info) and not loader.loaded(key):
+        return run_in_pool(loader.load, key)
+    return loader.load(key)
+
+
+def get_loaders(info):
+    """Return the loaders bound to the current request, creating them on first use."""
+    context = info.context
+    loaders = getattr(context, "_crm_loaders", None)
+    if loaders is None:
+        loaders = Loaders()
+        try:
+            context._crm_loaders = loaders
+        except AttributeError:
+            # No request object to hang them on (e.g. schema.execute without context)
+            pass
+    return loaders
@@ -0,0 +1,107 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import RequestFactory
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+from crm.products.models import Product
+from crm.schema import schema
+
+CREATE_ORDER = """
+mutation($customerId: ID!, $productIds: [ID!]!) {
+  createOrder(customerId: $customerId, productIds: $productIds) { success errors }
+}
+"""
+
+
+class Command(BaseCommand):
+    help = 'Hammer createOrder from many threads and check that no product is oversold'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--orders', type=int, default=2000, help='Total createOrder calls')
+        parser.add_argument('--products', type=int, default=5)
+        parser.add_argument('--stock', type=int, default=500, help='Initial stock per product')
+        parser.add_argument('--per-order', type=int, default=2, help='Products per order')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark rows')
+
+    def setup(self, options):
+        customer = Customer.objects.create(
+            name='bench', email=f'bench-{time.time_ns()}@example.com'
+        )
+        products = Product.objects.bulk_create([
+            Product(name=f'bench-{i}', stock=options['stock'], price=1)
+            for i in range(options['products'])
+        ])
+        return customer, [p.pk for p in products]
+
+    def place(self, customer, product_ids, i, per_order):
+        # Overlapping product sets so concurrent orders contend for the same rows
+        chosen = [product_ids[(i + k) % len(product_ids)] for k in range(per_order)]
+        request = RequestFactory().post('/graphql')
+        try:
+            result = schema.execute(
+                CREATE_ORDER,
+                variables={'customerId': customer.pk, 'productIds': chosen},
+                context_value=request,
+            )
+            if result.errors:
+                return f'error: {result.errors[0].message}'
+            data = result.data['createOrder']
+            if data['success']:
+                return 'ok'
+            return 'out of stock' if 'stock' in ' '.join(data['errors']) else data['errors'][0]
+        except Exception as e:  # pylint: disable=broad-except
+            return f'error: {e}'
+        finally:
+            connections.close_all()
+
+    def handle(self, *args, **options):
+        if options['per_order'] > options['products']:
+            raise CommandError('--per-order cannot exceed --products')
+        customer, product_ids = self.setup(options)
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+                outcomes = Counter(pool.map(
+                    lambda i: self.place(customer, product_ids, i, options['per_order']),
+                    range(options['orders']),
+                ))
+            elapsed = time.perf_counter() - started
+            self.report(customer, product_ids, options, outcomes, elapsed)
+        finally:
+            if not options['keep']:
+                Order.objects.filter(customer=customer).delete()
+                Product.objects.filter(pk__in=product_ids).delete()
+                customer.delete()
+
+    def report(self, customer, product_ids, options, outcomes, elapsed):
+        placed = Order.objects.filter(customer=customer).count()
+        stock = dict(Product.objects.filter(pk__in=product_ids).values_list('pk', 'stock'))
+        sold = Counter(
+            Order.products.through.objects.filter(order__customer=customer)
+            .values_list('product_id', flat=True)
+        )
+        vendor = connections["default"].vendor
+        self.stdout.write(f'Backend: {vendor}, threads: {options["threads"]}')
+        for outcome, count in outcomes.most_common():
+            self.stdout.write(f'  {outcome}: {count}')
+        self.stdout.write(
+            f'{sum(outcomes.values())} calls in {elapsed:.2f}s '
+            f'({options["orders"] / elapsed:.0f} calls/s, {placed / elapsed:.0f} orders/s)'
+        )
+        oversold = [
+            pk for pk in product_ids
+            if stock[pk] < 0 or stock[pk] + sold[pk] != options['stock']
+        ]
+        if placed != outcomes['ok'] or oversold:
+            raise CommandError(
+                f'Stock drift: {placed} orders stored vs {outcomes["ok"]} ok, products {oversold}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'No oversells: {placed} orders placed, remaining stock {sorted(stock.values())}'
+        ))
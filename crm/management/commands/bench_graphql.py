@@ -0,0 +1,239 @@
+import json
+import math
+import platform
+import random
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+
+from crm.customers.models import Customer
+from crm.datagen import FIRST_NAMES, generate
+from crm.instrumentation import RequestMetrics
+from crm.products.models import Product
+from crm.schema import schema
+
+ALL_ORDERS = """
+query($first: Int!) {
+  allOrders(first: $first) {
+    totalCount
+    edges { node { id orderDate totalAmount customer { name email } products { name price } } }
+  }
+}
+"""
+ALL_CUSTOMERS = """
+query($name: String, $first: Int!) {
+  allCustomers(name: $name, orderBy: "-created_at", first: $first) {
+    edges { node { id name email phone } }
+  }
+}
+"""
+CREATE_ORDER = """
+mutation($customerId: ID!, $productIds: [ID!]!) {
+  createOrder(customerId: $customerId, productIds: $productIds) { success errors }
+}
+"""
+BULK_CREATE_CUSTOMERS = """
+mutation($customers: [JSONString!]!) {
+  bulkCreateCustomers(customers: $customers) { success errors }
+}
+"""
+UPDATE_LOW_STOCK = """
+mutation {
+  updateLowStockProducts(threshold: 10, incrementBy: 10) { ok updatedProducts { id stock } }
+}
+"""
+COUNTERS = "{ customersCount ordersCount ordersRevenue }"
+COUNTERS_EXACT = """
+{ customersCount(exact: true) ordersCount(exact: true) ordersRevenue(exact: true) }
+"""
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an ascending list."""
+    return samples[max(0, math.ceil(pct / 100 * len(samples)) - 1)]
+
+
+class Command(BaseCommand):
+    help = 'Time the hot GraphQL operations on synthetic data: latency percentiles and query counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=2000)
+        parser.add_argument('--products', type=int, default=200)
+        parser.add_argument('--orders', type=int, default=10000)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--page-size', type=int, default=50, help='Page size / bulk batch size')
+        parser.add_argument('--cases', nargs='+', help='Only run these cases')
+        parser.add_argument(
+            '--existing-db', action='store_true',
+            help='Use the configured database, not a throwaway SQLite one (mutations roll back)',
+        )
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--baseline', help='Compare against a JSON file written by --output')
+        parser.add_argument(
+            '--max-regression', type=float, default=0.25,
+            help='Fail when a p95 is this much slower than the baseline (0.25 = 25%%)',
+        )
+
+    def cases(self, options):
+        """name -> (document, variables(i), rollback)."""
+        rng = random.Random(options['seed'])
+        customer_ids = list(Customer.objects.values_list('pk', flat=True))
+        in_stock = list(Product.objects.filter(stock__gt=0).values_list('pk', flat=True))
+        if not customer_ids or len(in_stock) < 2:
+            raise CommandError('Need customers and at least two products in stock')
+        first = options['page_size']
+        return {
+            'allOrders': (ALL_ORDERS, lambda i: {'first': first}, False),
+            'allCustomers.filtered': (
+                ALL_CUSTOMERS,
+                lambda i: {'name': FIRST_NAMES[i % len(FIRST_NAMES)], 'first': first},
+                False,
+            ),
+            'createOrder': (
+                CREATE_ORDER,
+                lambda i: {
+                    'customerId': rng.choice(customer_ids),
+                    'productIds': rng.sample(in_stock, 2),
+                },
+                True,
+            ),
+            'bulkCreateCustomers': (
+                BULK_CREATE_CUSTOMERS,
+                lambda i: {'customers': [
+                    json.dumps({'name': f'Bench {k}', 'email': f'bench-{i}-{k}@example.com'})
+                    for k in range(first)
+                ]},
+                True,
+            ),
+            'updateLowStockProducts': (UPDATE_LOW_STOCK, lambda i: {}, True),
+            'counters': (COUNTERS, lambda i: {}, False),
+            'counters.exact': (COUNTERS_EXACT, lambda i: {}, False),
+        }
+
+    def call(self, document, variables, rollback):
+        metrics = RequestMetrics()
+        request = RequestFactory().post('/graphql')
+        # Mutations are undone after each call so every iteration sees the same data
+        with transaction.atomic():
+            with connection.execute_wrapper(metrics.record_query):
+                started = time.perf_counter()
+                result = schema.execute(document, variables=variables, context_value=request)
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(rollback)
+        if result.errors:
+            raise CommandError(f'{result.errors[0].message}')
+        return elapsed, metrics.queries
+
+    def measure(self, document, variables, rollback, options):
+        for i in range(options['warmup']):
+            self.call(document, variables(i), rollback)
+        timings, queries = [], []
+        for i in range(options['iterations']):
+            elapsed, count = self.call(document, variables(options['warmup'] + i), rollback)
+            timings.append(elapsed * 1000)
+            queries.append(count)
+        timings.sort()
+        return {
+            'iterations': len(timings),
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'max_ms': round(timings[-1], 3),
+            'queries': max(queries),
+        }
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+        old_name = None
+        if not options['existing_db']:
+            if connection.vendor != 'sqlite':
+                raise CommandError('The throwaway database is SQLite only; pass --existing-db')
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            if not options['existing_db']:
+                started = time.perf_counter()
+                counts = generate(
+                    customers=options['customers'], products=options['products'],
+                    orders=options['orders'], seed=options['seed'],
+                )
+                self.stdout.write(
+                    f"Generated {counts['customers']} customers, {counts['products']} products, "
+                    f"{counts['orders']} orders in {time.perf_counter() - started:.2f}s"
+                )
+            results = self.run_cases(options)
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'meta': {
+                'backend': connection.vendor,
+                'debug': settings.DEBUG,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                **{
+                    key: options[key]
+                    for key in ('customers', 'products', 'orders', 'iterations', 'seed')
+                },
+            },
+            'cases': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        if options['baseline']:
+            self.compare(results, options)
+
+    def run_cases(self, options):
+        cases = self.cases(options)
+        selected = options['cases'] or list(cases)
+        unknown = set(selected) - set(cases)
+        if unknown:
+            raise CommandError(
+                f"Unknown cases: {', '.join(sorted(unknown))}. Known: {', '.join(cases)}"
+            )
+        self.stdout.write(
+            f"{'case':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'queries':>9}"
+        )
+        results = {}
+        for name in selected:
+            document, variables, rollback = cases[name]
+            stats = results[name] = self.measure(document, variables, rollback, options)
+            self.stdout.write(
+                f"{name:<24}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+                f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}{stats['queries']:>9}"
+            )
+        return results
+
+    def compare(self, results, options):
+        with open(options['baseline']) as f:
+            baseline = json.load(f)['cases']
+        failures = []
+        self.stdout.write(f"\nAgainst {options['baseline']}:")
+        for name, stats in results.items():
+            before = baseline.get(name)
+            if before is None:
+                self.stdout.write(f'  {name}: not in baseline')
+                continue
+            change = stats['p95_ms'] / before['p95_ms'] - 1 if before['p95_ms'] else 0
+            line = (
+                f"  {name}: p95 {before['p95_ms']:.2f} -> {stats['p95_ms']:.2f} ms "
+                f"({change:+.0%}), "
+                f"queries {before['queries']} -> {stats['queries']}"
+            )
+            if change > options['max_regression'] or stats['queries'] > before['queries']:
+                failures.append(name)
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+        if failures:
+            raise CommandError(f"Regressed against the baseline: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
@@ -0,0 +1,79 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Delete customers with no order since --cutoff-days ago, in small pk-ordered batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cutoff-days', type=int, default=365)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--dry-run', action='store_true', help='Only count what would be deleted'
+        )
+        parser.add_argument('--log-file', default='/tmp/customer_cleanup_log.txt')
+
+    def inactive(self, cutoff):
+        recent = Order.objects.filter(customer=OuterRef('pk'), order_date__gte=cutoff)
+        return Customer.objects.filter(~Exists(recent)).order_by('pk')
+
+    def delete_batch(self, inactive, pks):
+        """Delete one batch in its own short transaction; returns (customers, orders)."""
+        with transaction.atomic():
+            # Re-select under lock: a customer who ordered since the scan is kept, and
+            # nobody can attach a new order while the batch is being removed
+            pks = list(inactive.filter(pk__in=pks).select_for_update().values_list('pk', flat=True))
+            if not pks:
+                return 0, 0
+            # The collector cascades to orders, their product rows and reminders; the
+            # post_delete receivers keep the dashboard counters and response cache in step
+            _, deleted = Customer.objects.filter(pk__in=pks).delete()
+        return deleted.get(Customer._meta.label, 0), deleted.get(Order._meta.label, 0)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['cutoff_days'])
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        inactive = self.inactive(cutoff)
+
+        started = time.perf_counter()
+        customers = orders = batches = 0
+        last_pk = None
+        while True:
+            page = inactive if last_pk is None else inactive.filter(pk__gt=last_pk)
+            pks = list(page.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            last_pk = pks[-1]
+            batch_started = time.perf_counter()
+            if dry_run:
+                deleted = len(pks)
+                deleted_orders = Order.objects.filter(customer_id__in=pks).count()
+            else:
+                deleted, deleted_orders = self.delete_batch(inactive, pks)
+            batches += 1
+            customers += deleted
+            orders += deleted_orders
+            self.stdout.write(
+                f'batch {batches}: pk {pks[0]}..{last_pk}, {deleted} customers, '
+                f'{deleted_orders} orders in {time.perf_counter() - batch_started:.3f}s'
+            )
+
+        elapsed = time.perf_counter() - started
+        verb = 'Would delete' if dry_run else 'Deleted'
+        summary = (
+            f'{verb} customers: {customers} ({orders} orders) in {batches} batches, '
+            f'{elapsed:.2f}s, {customers / elapsed if elapsed else 0:.0f} customers/s'
+        )
+        self.stdout.write(self.style.SUCCESS(summary))
+        if options['log_file']:
+            with open(options['log_file'], 'a') as f:
+                f.write(f"{timezone.now().strftime('%d/%m/%Y-%H:%M:%S')} {summary}\n")
@@ -0,0 +1,41 @@
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from crm.reports import CHUNK_SIZE, TOP, build_report, write_report
+
+
+class Command(BaseCommand):
+    help = 'Write the order value / basket / top customer report (compact JSON)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='First order day (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Last order day, inclusive')
+        parser.add_argument('--top', type=int, default=TOP)
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            '--output', help='Report file (default CRM_REPORT_DIR/crm_report_<date>.json)'
+        )
+        parser.add_argument('--stdout', action='store_true', help='Print the report instead')
+
+    def handle(self, *args, **options):
+        try:
+            date_from, date_to = (
+                date.fromisoformat(options[key]) if options[key] else None
+                for key in ('date_from', 'date_to')
+            )
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+        report = build_report(
+            date_from, date_to, top=options['top'], chunk_size=options['chunk_size']
+        )
+        if options['stdout']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        path = write_report(report, options['output'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['orders']['count']} orders in {report['elapsed_seconds']}s -> {path}"
+        ))
@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from crm.customers.models import Customer
+from crm.filters import CustomerFilter, OrderFilter, ProductFilter
+from crm.orders.models import Order
+from crm.products.models import Product
+
+
+def _filtered(filterset, model, **data):
+    return filterset(data=data, queryset=model.objects.all()).qs
+
+
+class Command(BaseCommand):
+    help = 'Print query plans for the filter/ordering queries, with and without the filter indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--compare', action='store_true',
+            help=(
+                'Also show the plans with the Meta.indexes dropped'
+                ' (inside a rolled-back transaction)'
+            ),
+        )
+
+    def queries(self):
+        now = timezone.now()
+        week_ago = now - timedelta(days=7)
+        return [
+            ('customers ordered by -created_at', Customer.objects.all()[:50]),
+            ('customers created_at range',
+             _filtered(CustomerFilter, Customer, created_at_gte=week_ago, created_at_lte=now)),
+            ('customers LOWER(email) IN (...)',
+             Customer.objects.annotate(u=Lower('email')).filter(u__in=['a@x.com', 'b@x.com'])),
+            ('customers name icontains', _filtered(CustomerFilter, Customer, name='ann')),
+            ('products ordered by name', Product.objects.all()[:50]),
+            ('products price range', _filtered(ProductFilter, Product, price_gte=10, price_lte=20)),
+            ('products stock < 10 (low-stock scan)', Product.objects.filter(stock__lt=10)),
+            ('orders ordered by -order_date', Order.objects.all()[:50]),
+            ('orders total_amount range',
+             _filtered(OrderFilter, Order, total_amount_gte=100, total_amount_lte=200)),
+            ('pendingOrdersLastWeek',
+             Order.objects.filter(status='pending', order_date__gte=week_ago)),
+            ('orders customer_name icontains', _filtered(OrderFilter, Order, customer_name='ann')),
+        ]
+
+    def explain(self, qs, tag):
+        sql, params = qs.query.sql_with_params()
+        prefix = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            # The trailing tag keeps sqlite3's statement cache from replaying a plan
+            # prepared before the indexes were dropped
+            cursor.execute(f'{prefix} {sql} -- {tag}', params)
+            return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+
+    def print_plans(self, heading, tag):
+        self.stdout.write(self.style.MIGRATE_HEADING(heading))
+        for label, qs in self.queries():
+            self.stdout.write(self.style.SUCCESS(f'-- {label}'))
+            self.stdout.write(self.explain(qs, tag))
+        self.stdout.write('')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Backend: {connection.vendor}\n')
+        if not options['compare']:
+            self.print_plans('With indexes', 'after')
+            return
+        with transaction.atomic():
+            self.print_plans('With indexes (after)', 'after')
+            with connection.cursor() as cursor:
+                for model in (Customer, Product, Order):
+                    for index in model._meta.indexes:
+                        cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+            self.print_plans('Without the filter indexes (before)', 'before')
+            transaction.set_rollback(True)
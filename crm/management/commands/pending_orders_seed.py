@@ -1,15 +1,25 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
-from customers.models import Customer
-from products.models import Product
-from orders.models import Order
+from crm.customers.models import Customer
+from crm.products.models import Product
+from crm.orders.models import Order
 
 class Command(BaseCommand):
     help = 'Seed some pending orders for testing'
 
     def handle(self, *args, **options):
-        c, _ = Customer.objects.get_or_create(email='test@example.com')
-        p, _ = Product.objects.get_or_create(name='Widget', defaults={'stock': 5})
-        Order.objects.get_or_create(customer=c, product=p, order_date=timezone.now() - timedelta(days=3), defaults={'status': 'pending'})
+        c, _ = Customer.objects.get_or_create(
+            email='test@example.com', defaults={'name': 'Test Customer'}
+        )
+        p, _ = Product.objects.get_or_create(name='Widget', defaults={'stock': 5, 'price': 10})
+        now = timezone.now()
+        recent = Order.objects.filter(
+            customer=c, status='pending', order_date__gte=now - timedelta(days=7)
+        )
+        if not recent.exists():
+            o = Order.objects.create(
+                customer=c, order_date=now - timedelta(days=3), total_amount=p.price
+            )
+            o.products.set([p])
         self.stdout.write(self.style.SUCCESS('Seeded test pending order'))
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from graphene_django.settings import graphene_settings
+from graphql import parse, validate
+
+from crm.documents import PersistedQueryStore, query_hash
+
+
+class Command(BaseCommand):
+    help = 'Validate GraphQL documents and add them to the persisted query allowlist'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='.graphql/.gql files or directories')
+        parser.add_argument(
+            '--file', default=None,
+            help='Allowlist to write (defaults to settings.GRAPHQL_PERSISTED_QUERIES_FILE)',
+        )
+        parser.add_argument('--replace', action='store_true', help='Drop existing entries first')
+
+    def _documents(self, paths):
+        for raw in paths:
+            path = Path(raw)
+            if path.is_dir():
+                yield from sorted(p for p in path.rglob('*') if p.suffix in ('.graphql', '.gql'))
+            elif path.exists():
+                yield path
+            else:
+                raise CommandError(f'No such file: {path}')
+
+    def handle(self, *args, **options):
+        target = options['file'] or getattr(settings, 'GRAPHQL_PERSISTED_QUERIES_FILE', None)
+        if not target:
+            raise CommandError('Set GRAPHQL_PERSISTED_QUERIES_FILE or pass --file')
+        schema = graphene_settings.SCHEMA.graphql_schema
+        allowlist = {} if options['replace'] else PersistedQueryStore.read_file(target)
+        added = 0
+        for path in self._documents(options['paths']):
+            query = path.read_text()
+            try:
+                errors = validate(schema, parse(query))
+            except Exception as e:  # pylint: disable=broad-except
+                raise CommandError(f'{path}: {e}')
+            if errors:
+                raise CommandError(f'{path}: {"; ".join(e.message for e in errors)}')
+            digest = query_hash(query)
+            added += digest not in allowlist
+            allowlist[digest] = query
+            self.stdout.write(f'{digest}  {path}')
+        with open(target, 'w') as f:
+            json.dump(allowlist, f, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(
+            f'Persisted {added} new queries ({len(allowlist)} total) to {target}'
+        ))
@@ -0,0 +1,44 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from crm.db_routing import replica_health, routing_config
+
+
+def _path(name):
+    # Replica NAMEs are read-only URIs: file:/path/db_replica1.sqlite3?mode=ro
+    name = str(name)
+    if name.startswith('file:'):
+        name = name[len('file:'):].split('?', 1)[0]
+    return name
+
+
+class Command(BaseCommand):
+    help = 'Copy the SQLite primary into the SQLite replica files (local stand-in for replication)'
+
+    def handle(self, *args, **options):
+        config = routing_config()
+        primary = connections[config['PRIMARY']]
+        if primary.vendor != 'sqlite':
+            raise CommandError('The primary is not SQLite; real replicas sync themselves')
+        replicas = [alias for alias in config['REPLICAS'] if connections[alias].vendor == 'sqlite']
+        if not replicas:
+            raise CommandError('No SQLite replicas configured (set CRM_SQLITE_REPLICAS)')
+
+        source = sqlite3.connect(_path(primary.settings_dict['NAME']))
+        try:
+            for alias in replicas:
+                connections[alias].close()
+                path = _path(connections[alias].settings_dict['NAME'])
+                target = sqlite3.connect(path)
+                try:
+                    # Online backup: a consistent snapshot even while the primary takes writes
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: {path}')
+        finally:
+            source.close()
+        replica_health.reset()
+        self.stdout.write(self.style.SUCCESS(f'Synced {len(replicas)} replicas'))
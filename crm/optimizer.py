@@ -0,0 +1,75 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+from graphql.language import FieldNode, FragmentSpreadNode, InlineFragmentNode
+
+
+def _collect(nodes, fragments):
+    """Merge the sub-selections of ``nodes`` into {field name: [FieldNode, ...]}."""
+    fields = {}
+    pending = [sel for node in nodes if node.selection_set for sel in node.selection_set.selections]
+    while pending:
+        sel = pending.pop(0)
+        if isinstance(sel, FieldNode):
+            fields.setdefault(sel.name.value, []).append(sel)
+        elif isinstance(sel, FragmentSpreadNode):
+            fragment = fragments.get(sel.name.value)
+            if fragment is not None:
+                pending.extend(fragment.selection_set.selections)
+        elif isinstance(sel, InlineFragmentNode):
+            pending.extend(sel.selection_set.selections)
+    return fields
+
+
+def _plan(model, fields, fragments, prefix=""):
+    """Return (only, select_related, prefetches) for the selected ``fields`` of ``model``."""
+    only = [prefix + model._meta.pk.name]
+    select_related = []
+    prefetches = []
+    for name, nodes in fields.items():
+        try:
+            field = model._meta.get_field(to_snake_case(name))
+        except FieldDoesNotExist:
+            continue
+        if field.many_to_many or field.one_to_many:
+            related = field.related_model
+            lookup = field.name if field.concrete else field.get_accessor_name()
+            queryset = optimize_queryset(
+                related._default_manager.all(), _collect(nodes, fragments), fragments
+            )
+            prefetches.append(Prefetch(prefix + lookup, queryset=queryset))
+        elif field.is_relation:
+            path = prefix + field.name
+            only.append(path)
+            select_related.append(path)
+            sub_only, sub_select, sub_prefetch = _plan(
+                field.related_model, _collect(nodes, fragments), fragments, prefix=path + "__"
+            )
+            only.extend(sub_only)
+            select_related.extend(sub_select)
+            prefetches.extend(sub_prefetch)
+        elif field.concrete:
+            only.append(prefix + field.attname)
+    return only, select_related, prefetches
+
+
+def optimize_queryset(queryset, fields, fragments):
+    only, select_related, prefetches = _plan(queryset.model, fields, fragments)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset.only(*dict.fromkeys(only))
+
+
+def optimize(queryset, info):
+    """Trim ``queryset`` to what the current GraphQL selection actually reads.
+
+    Scalars become ``only()``, forward relations ``select_related()`` and
+    many-valued relations a ``Prefetch`` with its own trimmed queryset.
+    Relay connections are unwrapped through ``edges { node }``.
+    """
+    fields = _collect(info.field_nodes, info.fragments)
+    if "edges" in fields:
+        fields = _collect(_collect(fields["edges"], info.fragments).get("node", []), info.fragments)
+    return optimize_queryset(queryset, fields, info.fragments)
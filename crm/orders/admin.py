@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order
+from .models import Order, OrderReminder
 
 
 @admin.register(Order)
@@ -12,3 +12,10 @@ class OrderAdmin(admin.ModelAdmin):
     def products_list(self, obj):  # pragma: no cover - admin display helper
         return ", ".join(p.name for p in obj.products.all()[:5]) + ("..." if obj.products.count() > 5 else "")
     products_list.short_description = "Products"
+
+
+@admin.register(OrderReminder)
+class OrderReminderAdmin(admin.ModelAdmin):
+    list_display = ("order", "customer", "sent_at")
+    search_fields = ("customer__email",)
+    raw_id_fields = ("order", "customer")
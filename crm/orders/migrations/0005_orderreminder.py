@@ -0,0 +1,27 @@
+# Generated by Django 4.2.15 on 2026-10-18 16:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0006_customer_phone_digits'),
+        ('orders', '0004_order_order_date_idx_order_order_total_amount_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sent_at', models.DateTimeField()),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_reminders', to='customers.customer')),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reminder', to='orders.order')),
+            ],
+            options={
+                'ordering': ['-sent_at'],
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Sum
 from crm.customers.models import Customer
 from crm.products.models import Product
 from decimal import Decimal
@@ -13,13 +14,50 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-order_date"]
+        indexes = [
+            models.Index(fields=["order_date"], name="order_date_idx"),
+            models.Index(fields=["total_amount"], name="order_total_amount_idx"),
+            # pendingOrdersLastWeek: status = 'pending' AND order_date >= cutoff
+            models.Index(fields=["status", "order_date"], name="order_status_date_idx"),
+        ]
 
-    def calculate_total(self):
-        total = Decimal("0")
-        for p in self.products.all():
-            total += p.price or 0
+    def calculate_total(self, products=None):
+        """Set and return the order total.
+
+        Sums ``products`` in memory when the caller already fetched them,
+        otherwise runs a single SUM aggregate over the order's products.
+        """
+        if products is not None:
+            total = sum((p.price or 0 for p in products), Decimal("0"))
+        else:
+            total = self.products.aggregate(total=Sum("price"))["total"] or Decimal("0")
         self.total_amount = total
         return total
 
+    def delete(self, *args, **kwargs):
+        # product.orders.add/remove() moves the stored total without touching loaded
+        # orders; post_delete takes the total off the revenue counter, so use the stored one
+        if self.pk is not None:
+            self.refresh_from_db(fields=["total_amount"])
+        return super().delete(*args, **kwargs)
+
     def __str__(self):  # pragma: no cover - trivial
         return f"Order {self.id} - {self.customer.email}"
+
+
+class OrderReminder(models.Model):
+    """A sent pending-order reminder; one row per order it covered.
+
+    The unique order makes reruns idempotent: orders with a row are never
+    reminded about again.
+    """
+
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name="reminder")
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name="order_reminders")
+    sent_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-sent_at"]
+
+    def __str__(self):  # pragma: no cover - trivial
+        return f"Reminder for order {self.order_id}"
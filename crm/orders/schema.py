@@ -2,24 +2,37 @@ import graphene
 from graphene_django import DjangoObjectType
 from django.utils import timezone
 from datetime import timedelta
+from crm.customers.models import Customer
+from crm.async_resolvers import async_capable, executing_async, run_in_pool
+from crm.optimizer import optimize
 from .models import Order
 
-class CustomerType(graphene.ObjectType):
-    email = graphene.String()
+class CustomerType(DjangoObjectType):
+    # A model type, so cached responses that select it carry the Customer tag
+    class Meta:
+        model = Customer
+        fields = ("email",)
+        name = 'PendingOrderCustomer'
+        # crm.schema.CustomerType stays the type Customer relations convert to
+        skip_registry = True
 
 class OrderType(DjangoObjectType):
     class Meta:
         model = Order
         fields = ("id", "order_date", "status")
+        name = 'PendingOrder'
 
     customer = graphene.Field(CustomerType)
 
+    @async_capable
     def resolve_customer(self, info):
-        return CustomerType(email=self.customer.email)
+        if executing_async(info) and not Order.customer.is_cached(self):
+            return run_in_pool(OrderType.resolve_customer, self, info)
+        return self.customer
 
 class Query(graphene.ObjectType):
     pending_orders_last_week = graphene.List(OrderType, name='pendingOrdersLastWeek')
 
     def resolve_pending_orders_last_week(root, info):
         cutoff = timezone.now() - timedelta(days=7)
-        return Order.objects.filter(status='pending', order_date__gte=cutoff)
+        return optimize(Order.objects.filter(status='pending', order_date__gte=cutoff), info)
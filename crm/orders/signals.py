@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+from django.db.models import F, Sum
+from django.db.models.signals import m2m_changed
+from django.dispatch import Signal, receiver
+
+from crm.products.models import Product
+from .models import Order
+
+# Sent after stored order totals moved by ``delta`` without a save(), with
+# ``order_count`` rows affected (e.g. for the dashboard revenue counter)
+order_totals_shifted = Signal()
+
+
+def _shift_totals(order_ids, delta):
+    if not order_ids or not delta:
+        return
+    count = Order.objects.filter(pk__in=order_ids).update(total_amount=F("total_amount") + delta)
+    if count:
+        order_totals_shifted.send(sender=Order, order_count=count, delta=delta)
+
+
+def _adjust_loaded(order, delta):
+    # Keep the in-memory instance in step unless the field was deferred
+    if "total_amount" in order.__dict__:
+        order.total_amount = (order.total_amount or Decimal("0")) + delta
+
+
+@receiver(m2m_changed, sender=Order.products.through)
+def maintain_order_total(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep Order.total_amount in step with Order.products incrementally.
+
+    add/remove shift the stored total by the price of the changed products
+    instead of re-summing the whole order; pk_set only holds rows that actually
+    changed, so the delta is exact.
+    """
+    if action not in ("post_add", "post_remove", "pre_clear", "post_clear"):
+        return
+    sign = -1 if action == "post_remove" else 1
+
+    if not reverse:
+        # order.products.add/remove/clear(...)
+        if action == "pre_clear":
+            instance._cleared_total = (
+                Order.objects.filter(pk=instance.pk).values_list("total_amount", flat=True).first()
+            )
+            return
+        if action == "post_clear":
+            delta = -(instance.__dict__.pop("_cleared_total", None) or Decimal("0"))
+        else:
+            delta = Product.objects.filter(pk__in=pk_set).aggregate(total=Sum("price"))["total"]
+            delta = sign * (delta or Decimal("0"))
+        _shift_totals([instance.pk], delta)
+        _adjust_loaded(instance, delta)
+        return
+
+    # product.orders.add/remove/clear(...): every affected order moves by this price
+    if action == "pre_clear":
+        instance._cleared_order_ids = list(instance.orders.values_list("pk", flat=True))
+        return
+    if action == "post_clear":
+        pk_set = instance.__dict__.pop("_cleared_order_ids", [])
+        sign = -1
+    _shift_totals(pk_set, sign * (instance.price or Decimal("0")))
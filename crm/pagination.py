@@ -0,0 +1,165 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import graphene
+from django.db.models import F, Q
+from graphene import relay
+from graphene.relay.connection import PageInfo
+from graphql import GraphQLError
+from graphql_relay.utils import base64, unbase64
+
+from .fields import BatchedConnectionField
+
+KEYSET_PREFIX = "keyset:"
+
+
+class CountableConnection(relay.Connection):
+    """Connection exposing ``totalCount``; the COUNT only runs when it is selected."""
+
+    class Meta:
+        abstract = True
+
+    total_count = graphene.Int()
+
+    def resolve_total_count(self, info):
+        if getattr(self, "length", None) is None:
+            self.length = self.iterable.count()
+        return self.length
+
+
+def _field_for(model, path):
+    field = None
+    for part in path.split("__"):
+        field = model._meta.pk if part == "pk" else model._meta.get_field(part)
+        model = field.related_model or model
+    return field
+
+
+def _dump(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _ordering_keys(queryset):
+    """Return [(lookup, descending), ...] for the queryset ordering with a pk tiebreak."""
+    ordering = queryset.query.order_by or (
+        queryset.model._meta.ordering if queryset.query.default_ordering else ()
+    )
+    keys = []
+    for key in ordering:
+        if not isinstance(key, str) or key == "?":
+            raise GraphQLError("Keyset pagination needs a plain field ordering")
+        keys.append((key.lstrip("-"), key.startswith("-")))
+    if not any(name in ("pk", queryset.model._meta.pk.name) for name, _ in keys):
+        keys.append(("pk", keys[-1][1] if keys else False))
+    return keys
+
+
+def encode_cursor(values):
+    return base64(KEYSET_PREFIX + json.dumps([_dump(v) for v in values]))
+
+
+def decode_cursor(cursor, queryset, keys):
+    model = queryset.model
+    annotations = queryset.query.annotations
+    try:
+        raw = unbase64(cursor)
+        if not raw.startswith(KEYSET_PREFIX):
+            raise ValueError(cursor)
+        values = json.loads(raw[len(KEYSET_PREFIX):])
+        if len(values) != len(keys):
+            raise ValueError(cursor)
+        # Annotation keys (e.g. the search rank) round-trip as plain JSON values
+        return [
+            v if name in annotations else _field_for(model, name).to_python(v)
+            for (name, _), v in zip(keys, values)
+        ]
+    except Exception:  # pylint: disable=broad-except
+        raise GraphQLError(f"Invalid keyset cursor: {cursor}")
+
+
+def _seek(keys, values, forward):
+    # (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... honouring each key's direction
+    condition = Q()
+    for i, (name, desc) in enumerate(keys):
+        op = "lt" if desc == forward else "gt"
+        term = Q(**{f"{name}__{op}": values[i]})
+        for (prev_name, _), prev_value in zip(keys[:i], values[:i]):
+            term &= Q(**{prev_name: prev_value})
+        condition |= term
+    return condition
+
+
+def keyset_connection(connection, queryset, args, max_limit=None):
+    """Slice ``queryset`` by seeking past the cursor instead of OFFSET/COUNT."""
+    if args.get("offset") is not None:
+        raise GraphQLError("offset cannot be combined with keyset pagination")
+    first, last = args.get("first"), args.get("last")
+    after, before = args.get("after"), args.get("before")
+    if first is None and last is None:
+        first = max_limit
+    keys = _ordering_keys(queryset)
+    aliases = [f"_keyset_{i}" for i in range(len(keys))]
+    page = queryset.annotate(**{alias: F(name) for alias, (name, _) in zip(aliases, keys)})
+    forward = last is None or first is not None
+    if after:
+        page = page.filter(_seek(keys, decode_cursor(after, queryset, keys), forward=True))
+    if before:
+        page = page.filter(_seek(keys, decode_cursor(before, queryset, keys), forward=False))
+
+    if forward:
+        page = page.order_by(*[("-" if desc else "") + name for name, desc in keys])
+        limit = first
+    else:
+        page = page.order_by(*[("" if desc else "-") + name for name, desc in keys])
+        limit = last
+    rows = list(page[: limit + 1]) if limit is not None else list(page)
+    has_more = limit is not None and len(rows) > limit
+    rows = rows[:limit] if limit is not None else rows
+    if not forward:
+        rows.reverse()
+    trimmed = False
+    if first is not None and last is not None and len(rows) > last:
+        trimmed = True
+        rows = rows[len(rows) - last:]
+
+    edges = [
+        connection.Edge(node=row, cursor=encode_cursor([getattr(row, a) for a in aliases]))
+        for row in rows
+    ]
+    result = connection(
+        edges=edges,
+        page_info=PageInfo(
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+            has_previous_page=(bool(after) or trimmed) if forward else has_more,
+            has_next_page=has_more if forward else bool(before),
+        ),
+    )
+    result.iterable = queryset
+    result.length = None
+    return result
+
+
+class KeysetConnectionField(BatchedConnectionField):
+    """Connection field with an opt-in ``keyset: true`` cursor-on-column mode.
+
+    Keyset cursors encode the row's ordering values plus its pk, so every page
+    is a bounded index seek and no COUNT(*) runs unless ``totalCount`` is asked for.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault(
+            "keyset", graphene.Boolean(description="Use keyset (cursor-on-column) pagination")
+        )
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def resolve_connection(cls, connection, args, iterable, max_limit=None):
+        if args.get("keyset"):
+            return keyset_connection(connection, iterable, args, max_limit=max_limit)
+        return super().resolve_connection(connection, args, iterable, max_limit=max_limit)
@@ -0,0 +1,197 @@
+import math
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.db import OperationalError, connections, transaction
+from django.db.models import BooleanField, Func, Value
+from graphql import GraphQLError
+
+try:  # Python 3.11+
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # pragma: no cover - older Pythons
+    import sre_constants
+    import sre_parse
+
+from crm.customers.models import normalize_phone
+
+MAX_PATTERN_LENGTH = 64
+PATTERN_CACHE_SIZE = 256
+# Wall-clock budget of each statement matching a free-form pattern against the table
+SCAN_TIMEOUT = 0.5
+
+# Digits and phone punctuation only, so the pattern is a literal phone fragment
+_LITERAL = re.compile(r"(?:\\[+()\-. ]|[\d\- ])+")
+_REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+
+def literal_lookup(pattern):
+    """Map a literal phone pattern to ``(lookup, value)`` on ``phone_digits``, else None.
+
+    ``^+1``/``+1`` (country code) and ``^555`` are prefixes, ``1234$`` a suffix,
+    ``^...$`` an exact match and a bare fragment a substring match.
+    """
+    body = pattern.strip()
+    starts = body.startswith("^")
+    body = body[1:] if starts else body
+    ends = body.endswith("$") and not body.endswith("\\$")
+    body = body[:-1] if ends else body
+    if body.startswith("+"):
+        starts = True
+        body = "\\" + body
+    if not _LITERAL.fullmatch(body):
+        return None
+    value = normalize_phone(body.replace("\\", ""))
+    if value is None:
+        return None
+    if starts and ends:
+        return "exact", value
+    if starts:
+        return "startswith", value
+    return ("endswith" if ends else "contains"), value
+
+
+def _nested_repeat(parsed, in_repeat=False):
+    for op, av in parsed:
+        if op in _REPEATS:
+            _, high, sub = av
+            repeats = high is sre_constants.MAXREPEAT or high > 1
+            if in_repeat and repeats:
+                return True
+            if _nested_repeat(sub, in_repeat or repeats):
+                return True
+        elif op is sre_constants.BRANCH:
+            if in_repeat:
+                return True
+            if any(_nested_repeat(sub, in_repeat) for sub in av[1]):
+                return True
+        elif op is sre_constants.SUBPATTERN:
+            if _nested_repeat(av[-1], in_repeat):
+                return True
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if _nested_repeat(av[1], in_repeat):
+                return True
+        elif op is sre_constants.GROUPREF:
+            return True
+    return False
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern):
+    """Compile a free-form phone regex once, rejecting ones that can backtrack badly."""
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise GraphQLError(f"phonePattern is longer than {MAX_PATTERN_LENGTH} characters")
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error as e:
+        raise GraphQLError(f"Invalid phonePattern: {e}") from e
+    if _nested_repeat(parsed):
+        raise GraphQLError("phonePattern is too complex (nested repetition or backreference)")
+    return re.compile(pattern)
+
+
+_deadline = ContextVar("crm_phone_scan_deadline", default=math.inf)
+
+
+def _sqlite_phone_match(pattern, phone):
+    if phone is None:
+        return None
+    # Raising aborts the statement (OperationalError), which is how the scan times out
+    if time.monotonic() > _deadline.get():
+        raise TimeoutError
+    return bool(compile_pattern(pattern).search(phone))
+
+
+def install_phone_match(sender, connection, **kwargs):
+    """``connection_created`` receiver registering ``crm_phone_match()`` on SQLite."""
+    if connection.vendor == "sqlite":
+        connection.connection.create_function(
+            "crm_phone_match", 2, _sqlite_phone_match, deterministic=True
+        )
+
+
+class PhoneMatch(Func):
+    """``crm_phone_match(pattern, phone)``: Python's ``re.search`` as an SQLite function."""
+
+    function = "crm_phone_match"
+    output_field = BooleanField()
+
+
+@contextmanager
+def _time_limit(connection, seconds):
+    if connection.vendor == "postgresql":
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f"SET LOCAL statement_timeout = {math.ceil(seconds * 1000)}")
+            yield
+    else:
+        token = _deadline.set(time.monotonic() + seconds)
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+
+
+@contextmanager
+def _scan_limit(queryset):
+    try:
+        with _time_limit(connections[queryset.db], SCAN_TIMEOUT):
+            yield
+    except OperationalError as e:
+        raise GraphQLError(
+            "phonePattern took too long; use a prefix such as ^+1 or a suffix"
+        ) from e
+
+
+class TimeLimitedQuerySet:
+    """QuerySet mixin evaluating the queryset's own statements under ``SCAN_TIMEOUT``.
+
+    The page query and the COUNT of the connection each get the full budget,
+    whenever and on whichever thread the resolver evaluates them.
+    """
+
+    def _fetch_all(self):
+        if self._result_cache is None:
+            with _scan_limit(self):
+                super()._fetch_all()
+
+    def count(self):
+        with _scan_limit(self):
+            return super().count()
+
+    def exists(self):
+        with _scan_limit(self):
+            return super().exists()
+
+
+@lru_cache(maxsize=None)
+def _time_limited(queryset_class):
+    return type(f"TimeLimited{queryset_class.__name__}", (TimeLimitedQuerySet, queryset_class), {})
+
+
+def _scan(queryset, pattern):
+    """Filter on ``pattern`` in the database; the match runs when the queryset is evaluated."""
+    if connections[queryset.db].vendor == "sqlite":
+        matches = queryset.filter(PhoneMatch(Value(pattern), "phone"))
+    else:
+        matches = queryset.filter(phone__regex=pattern)
+    # Clones keep the class, so pagination's slices and counts stay time limited
+    if not isinstance(matches, TimeLimitedQuerySet):
+        matches.__class__ = _time_limited(type(matches))
+    return matches
+
+
+def filter_phone(queryset, pattern):
+    """Restrict ``queryset`` to customers whose phone matches ``pattern``."""
+    literal = literal_lookup(pattern)
+    if literal is not None:
+        lookup, value = literal
+        if lookup == "startswith":
+            # A range rather than LIKE, so every backend can seek customer_phone_digits_idx
+            # (SQLite only uses an index for LIKE under NOCASE/case_sensitive_like)
+            upper = value[:-1] + chr(ord(value[-1]) + 1)
+            return queryset.filter(phone_digits__gte=value, phone_digits__lt=upper)
+        return queryset.filter(**{f"phone_digits__{lookup}": value})
+    compile_pattern(pattern)
+    return _scan(queryset, pattern)
@@ -0,0 +1,60 @@
+from django.db import migrations
+
+# Full-text search index for crm.search. SQLite: an external-content FTS5 table kept
+# in sync by triggers (a later migration that remakes products_product must
+# recreate the triggers). PostgreSQL: a GIN index on the search tsvector.
+TABLE = "products_product"
+FTS = "products_product_fts"
+COLUMNS = ("name",)
+
+
+def _sqlite_forwards(schema_editor):
+    cols = ", ".join(COLUMNS)
+    new = ", ".join(f"new.{c}" for c in COLUMNS)
+    old = ", ".join(f"old.{c}" for c in COLUMNS)
+    for sql in (
+        f"CREATE VIRTUAL TABLE {FTS} USING fts5({cols}, content='{TABLE}', content_rowid='id')",
+        f"CREATE TRIGGER {FTS}_ai AFTER INSERT ON {TABLE} BEGIN "
+        f"INSERT INTO {FTS}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {FTS}_ad AFTER DELETE ON {TABLE} BEGIN "
+        f"INSERT INTO {FTS}({FTS}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER {FTS}_au AFTER UPDATE OF {cols} ON {TABLE} BEGIN "
+        f"INSERT INTO {FTS}({FTS}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {FTS}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {FTS}({FTS}) VALUES ('rebuild')",
+    ):
+        schema_editor.execute(sql)
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        _sqlite_forwards(schema_editor)
+    elif vendor == "postgresql":
+        from django.contrib.postgres.indexes import GinIndex
+        from django.contrib.postgres.search import SearchVector
+
+        model = apps.get_model("products", "Product")
+        index = GinIndex(SearchVector(*COLUMNS, config="simple"), name="product_search_idx")
+        schema_editor.add_index(model, index)
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS}")
+    elif vendor == "postgresql":
+        schema_editor.execute('DROP INDEX IF EXISTS "product_search_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_product_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
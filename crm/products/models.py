@@ -1,4 +1,129 @@
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import F
+
+
+def _supports_update_returning(connection):
+    if connection.vendor == "postgresql":
+        return True
+    if connection.vendor == "sqlite":
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+
+class InsufficientStock(Exception):
+    """Raised by ``ProductManager.reserve``; ``missing``/``short`` hold the offending pks."""
+
+    def __init__(self, missing=(), short=()):
+        self.missing = sorted(missing)
+        self.short = sorted(short)
+        parts = []
+        if self.missing:
+            parts.append(f"Products not found: {', '.join(map(str, self.missing))}")
+        if self.short:
+            parts.append(f"Insufficient stock for products: {', '.join(map(str, self.short))}")
+        super().__init__("; ".join(parts))
+
+
+class ProductManager(models.Manager):
+    # Chunk size for the pk re-read on backends without UPDATE ... RETURNING
+    RESTOCK_CHUNK_SIZE = 500
+
+    def restock_below(self, threshold, increment_by):
+        """Add ``increment_by`` to the stock of every product below ``threshold``.
+
+        Runs as a single ``UPDATE ... SET stock = stock + %s`` and returns the
+        updated products, read back via RETURNING where the backend allows it.
+        """
+        db = router.db_for_write(self.model)
+        if _supports_update_returning(connections[db]):
+            updated = self._restock_returning(db, threshold, increment_by)
+        else:
+            updated = self._restock_reread(db, threshold, increment_by)
+        return sorted(updated, key=lambda p: (p.name, p.pk))
+
+    def reserve(self, product_ids, quantity=1, skip_locked=False):
+        """Take ``quantity`` units of each product or none at all.
+
+        The rows are locked in pk order (so overlapping orders cannot deadlock)
+        and decremented with ``UPDATE ... SET stock = stock - n WHERE stock >= n``;
+        the conditional update alone already makes overselling impossible.
+        ``skip_locked`` fails fast instead of queueing behind a concurrent order.
+        Raises ``InsufficientStock`` after rolling the decrement back.
+        """
+        ids = {self.model._meta.pk.to_python(pk) for pk in product_ids}
+        db = router.db_for_write(self.model)
+        products = self.db_manager(db)
+        features = connections[db].features
+        skip_locked = skip_locked and features.has_select_for_update_skip_locked
+        with transaction.atomic(using=db):
+            if features.has_select_for_update:
+                locked = set(
+                    products.select_for_update(skip_locked=skip_locked)
+                    .filter(pk__in=ids)
+                    .order_by("pk")
+                    .values_list("pk", flat=True)
+                )
+                if locked != ids:
+                    # Skipped rows are held by a concurrent order: report them as short
+                    missing = ids - set(products.filter(pk__in=ids).values_list("pk", flat=True))
+                    raise InsufficientStock(missing=missing, short=ids - locked - missing)
+            # Without row locks (SQLite) this is the transaction's first statement, so it
+            # takes the write lock up front and waits out the busy timeout, rather than
+            # upgrading a read lock, which fails at once under contention
+            updated = products.filter(pk__in=ids, stock__gte=quantity).update(
+                stock=F("stock") - quantity
+            )
+            if updated != len(ids):
+                stock = dict(products.filter(pk__in=ids).values_list("pk", "stock"))
+                raise InsufficientStock(
+                    missing=ids - stock.keys(),
+                    short=[pk for pk, units in stock.items() if units < quantity],
+                )
+
+    def _restock_returning(self, db, threshold, increment_by):
+        connection = connections[db]
+        opts = self.model._meta
+        qn = connection.ops.quote_name
+        fields = opts.concrete_fields
+        stock = qn(opts.get_field("stock").column)
+        sql = (
+            "UPDATE {table} SET {stock} = {stock} + %s WHERE {stock} < %s RETURNING {cols}"
+        ).format(
+            table=qn(opts.db_table),
+            stock=stock,
+            cols=", ".join(qn(f.column) for f in fields),
+        )
+        cols = [f.get_col(opts.db_table) for f in fields]
+        converters = [
+            connection.ops.get_db_converters(col) + col.get_db_converters(connection)
+            for col in cols
+        ]
+        with transaction.atomic(using=db), connection.cursor() as cursor:
+            cursor.execute(sql, [increment_by, threshold])
+            rows = cursor.fetchall()
+        updated = []
+        for row in rows:
+            values = []
+            for value, col, funcs in zip(row, cols, converters):
+                for func in funcs:
+                    value = func(value, col, connection)
+                values.append(value)
+            updated.append(self.model.from_db(db, [f.attname for f in fields], values))
+        return updated
+
+    def _restock_reread(self, db, threshold, increment_by):
+        size = self.RESTOCK_CHUNK_SIZE
+        products = self.db_manager(db)
+        with transaction.atomic(using=db):
+            locked = products.filter(stock__lt=threshold).select_for_update()
+            pks = list(locked.values_list("pk", flat=True))
+            for start in range(0, len(pks), size):
+                chunk = pks[start:start + size]
+                products.filter(pk__in=chunk).update(stock=F("stock") + increment_by)
+            updated = []
+            for start in range(0, len(pks), size):
+                updated.extend(products.filter(pk__in=pks[start:start + size]))
+        return updated
 
 
 class Product(models.Model):
@@ -6,8 +131,16 @@ class Product(models.Model):
     stock = models.IntegerField(default=0)
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    objects = ProductManager()
+
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["name"], name="product_name_idx"),
+            models.Index(fields=["price"], name="product_price_idx"),
+            # Low-stock scans (restock_below, stock_lte filters)
+            models.Index(fields=["stock"], name="product_stock_idx"),
+        ]
 
     def __str__(self):  # pragma: no cover - trivial
         return self.name
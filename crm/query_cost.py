@@ -0,0 +1,180 @@
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from graphene_django.settings import graphene_settings
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    OperationType,
+    get_named_type,
+    get_nullable_type,
+    is_list_type,
+    value_from_ast_untyped,
+)
+
+DEFAULTS = {
+    "MAX_DEPTH": 12,
+    "MAX_PAGE_SIZE": None,  # defaults to RELAY_CONNECTION_MAX_LIMIT
+    "MAX_COST": 10000,
+    # Estimated length of lists that take no first/last, keyed "Type.field"
+    "DEFAULT_LIST_SIZE": 20,
+    "LIST_SIZES": {},
+}
+
+
+def _config():
+    config = {**DEFAULTS, **getattr(settings, "GRAPHQL_QUERY_COST", {})}
+    if config["MAX_PAGE_SIZE"] is None:
+        config["MAX_PAGE_SIZE"] = graphene_settings.RELAY_CONNECTION_MAX_LIMIT
+    return config
+
+
+def _is_connection(type_):
+    fields = getattr(type_, "fields", {})
+    return "edges" in fields and "pageInfo" in fields
+
+
+def _is_edge(type_):
+    fields = getattr(type_, "fields", {})
+    return "node" in fields and "cursor" in fields
+
+
+@dataclass
+class QueryCost:
+    """Rows an operation may touch, estimated from page sizes and list nesting."""
+
+    cost: int = 0
+    depth: int = 0
+    max_cost: int = 0
+    max_depth: int = 0
+    errors: list = field(default_factory=list)
+
+    def as_extension(self):
+        return {
+            "estimatedRows": self.cost,
+            "maxCost": self.max_cost,
+            "depth": self.depth,
+            "maxDepth": self.max_depth,
+        }
+
+
+class CostAnalyzer:
+    def __init__(self, schema, document, variables, config):
+        self.schema = schema
+        self.variables = variables
+        self.config = config
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        self.result = QueryCost(max_cost=config["MAX_COST"], max_depth=config["MAX_DEPTH"])
+
+    def argument(self, node, name):
+        for argument in node.arguments or ():
+            if argument.name.value == name:
+                return value_from_ast_untyped(argument.value, self.variables)
+        return None
+
+    def page_size(self, node, key):
+        sizes = [self.argument(node, "first"), self.argument(node, "last")]
+        sizes = [size for size in sizes if isinstance(size, int)]
+        limit = self.config["MAX_PAGE_SIZE"]
+        if not sizes:
+            return limit
+        size = max(sizes)
+        if limit and size > limit:
+            self.result.errors.append(GraphQLError(
+                f"Requested page size {size} on {key} exceeds the limit of {limit}.",
+                nodes=[node],
+                extensions={"code": "PAGE_SIZE_TOO_LARGE"},
+            ))
+        return size
+
+    def walk(self, parent_type, selection_set, multiplier, depth):
+        # Fragment cycles were already rejected by validation
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                self.visit_field(parent_type, selection, multiplier, depth)
+                continue
+            if isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments.get(selection.name.value)
+                if fragment is None:
+                    continue
+            else:
+                fragment = selection
+            fragment_type = parent_type
+            if fragment.type_condition is not None:
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+            self.walk(fragment_type, fragment.selection_set, multiplier, depth)
+
+    def visit_field(self, parent_type, node, multiplier, depth):
+        name = node.name.value
+        field_def = getattr(parent_type, "fields", {}).get(name)
+        if field_def is None or name.startswith("__"):
+            # Introspection (GraphiQL's schema query) is not charged
+            return
+        if depth > self.result.depth:
+            self.result.depth = depth
+            if depth == self.config["MAX_DEPTH"] + 1:
+                self.result.errors.append(GraphQLError(
+                    f"Query depth exceeds the limit of {self.config['MAX_DEPTH']}.",
+                    nodes=[node],
+                    extensions={"code": "QUERY_TOO_DEEP"},
+                ))
+        if node.selection_set is None or depth > self.config["MAX_DEPTH"]:
+            return
+
+        key = f"{parent_type.name}.{name}"
+        child_type = get_named_type(field_def.type)
+        if (_is_connection(parent_type) and name == "edges") or (
+            _is_edge(parent_type) and name == "node"
+        ):
+            # Connection plumbing; the rows were charged on the connection field
+            size = 1
+        elif _is_connection(child_type):
+            size = self.page_size(node, key)
+            self.result.cost += multiplier * size
+        elif is_list_type(get_nullable_type(field_def.type)):
+            size = self.config["LIST_SIZES"].get(key, self.config["DEFAULT_LIST_SIZE"])
+            self.result.cost += multiplier * size
+        else:
+            size = 1
+            self.result.cost += multiplier
+        self.walk(child_type, node.selection_set, multiplier * size, depth + 1)
+
+
+def analyze(schema, document, operation_ast, variables=None):
+    """Estimate the cost of ``operation_ast`` without executing it.
+
+    Connections count ``first``/``last`` rows (the page-size limit when
+    neither is given), other lists their ``LIST_SIZES`` estimate, and nested
+    selections multiply. Returns a ``QueryCost``; its ``errors`` are set when
+    ``GRAPHQL_QUERY_COST`` limits are exceeded.
+    """
+    config = _config()
+    values = {}
+    for definition in operation_ast.variable_definitions or ():
+        if definition.default_value is not None:
+            name = definition.variable.name.value
+            values[name] = value_from_ast_untyped(definition.default_value)
+    values.update(variables or {})
+
+    root_type = {
+        OperationType.QUERY: schema.query_type,
+        OperationType.MUTATION: schema.mutation_type,
+        OperationType.SUBSCRIPTION: schema.subscription_type,
+    }[operation_ast.operation]
+    analyzer = CostAnalyzer(schema, document, values, config)
+    analyzer.walk(root_type, operation_ast.selection_set, 1, 1)
+    result = analyzer.result
+    if result.cost > config["MAX_COST"]:
+        result.errors.append(GraphQLError(
+            f"Query cost {result.cost} exceeds the limit of {config['MAX_COST']};"
+            " request fewer rows per page or less nesting.",
+            nodes=[operation_ast],
+            extensions={"code": "QUERY_TOO_COMPLEX", "cost": result.as_extension()},
+        ))
+    return result
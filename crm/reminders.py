@@ -0,0 +1,178 @@
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from crm.orders.models import Order, OrderReminder
+
+logger = logging.getLogger(__name__)
+
+LOG_FILE = "/tmp/order_reminders_log.txt"
+
+
+@dataclass
+class Reminder:
+    customer_id: int
+    email: str
+    name: str
+    order_ids: list
+
+
+def pending_orders(days=7, batch_size=500):
+    """Yield ``(order_id, customer_id, email, name)`` for unreminded pending orders.
+
+    Pages with a ``(customer_id, id)`` keyset cursor, so each page is one bounded
+    query and a customer's orders arrive back to back.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    base = (
+        Order.objects.filter(status="pending", order_date__gte=cutoff, reminder__isnull=True)
+        .order_by("customer_id", "pk")
+        .values_list("pk", "customer_id", "customer__email", "customer__name")
+    )
+    cursor = None
+    while True:
+        page = base
+        if cursor is not None:
+            customer_id, pk = cursor
+            page = page.filter(
+                Q(customer_id__gt=customer_id) | Q(customer_id=customer_id, pk__gt=pk)
+            )
+        rows = list(page[:batch_size])
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        cursor = (rows[-1][1], rows[-1][0])
+
+
+def reminders(rows):
+    """Fold the order stream into one ``Reminder`` per customer."""
+    for customer_id, group in itertools.groupby(rows, key=lambda row: row[1]):
+        group = list(group)
+        _, _, email, name = group[0]
+        yield Reminder(customer_id, email, name, [row[0] for row in group])
+
+
+def record_sent(reminder, sent_at):
+    OrderReminder.objects.bulk_create(
+        [
+            OrderReminder(order_id=order_id, customer_id=reminder.customer_id, sent_at=sent_at)
+            for order_id in reminder.order_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class LogSender:
+    """Default sender: appends one line per reminder to ``LOG_FILE``."""
+
+    def __init__(self, path=LOG_FILE):
+        self.path = path
+        self._file = None
+        self._timestamp = None
+
+    async def __aenter__(self):
+        self._file = open(self.path, "a")
+        self._timestamp = timezone.now().strftime("%d/%m/%Y-%H:%M:%S")
+        return self
+
+    async def __aexit__(self, *exc):
+        self._file.close()
+
+    async def send(self, reminder):
+        ids = ",".join(map(str, reminder.order_ids))
+        self._file.write(
+            f"{self._timestamp} Reminder -> customer_email={reminder.email}, order_ids={ids}\n"
+        )
+
+
+class LocalSender:
+    """In-memory stand-in for a real notification backend (tests, dry runs)."""
+
+    def __init__(self, delay=0, fail_for=()):
+        self.delay = delay
+        self.fail_for = set(fail_for)
+        self.sent = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def send(self, reminder):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if reminder.email in self.fail_for:
+            raise ConnectionError(f"could not reach {reminder.email}")
+        self.sent.append(reminder)
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart across all workers."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self._next = 0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+
+async def dispatch(sender, days=7, batch_size=500, concurrency=10, rate=None):
+    """Send every due reminder through ``sender``; returns a summary dict."""
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    limiter = RateLimiter(rate)
+    stats = {"customers": 0, "orders": 0, "failed": 0}
+    stream = reminders(pending_orders(days=days, batch_size=batch_size))
+    done = object()
+
+    async def produce():
+        # The ORM is sync: pull each reminder on a worker thread; the bounded
+        # queue keeps at most a couple of pages' worth in memory
+        next_reminder = sync_to_async(lambda: next(stream, done), thread_sensitive=True)
+        while (reminder := await next_reminder()) is not done:
+            await queue.put(reminder)
+        for _ in range(concurrency):
+            await queue.put(done)
+
+    async def work():
+        while (reminder := await queue.get()) is not done:
+            await limiter.wait()
+            try:
+                await sender.send(reminder)
+            except Exception:  # pylint: disable=broad-except
+                # Not recorded, so the next run retries it
+                logger.exception("Reminder to customer %s failed", reminder.customer_id)
+                stats["failed"] += 1
+                continue
+            await sync_to_async(record_sent, thread_sensitive=True)(reminder, timezone.now())
+            stats["customers"] += 1
+            stats["orders"] += len(reminder.order_ids)
+
+    async with sender:
+        await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+    return stats
+
+
+def send_order_reminders(sender=None, **options):
+    """Run the reminder pipeline to completion (sync entry point for cron/Celery)."""
+    if sender is None:
+        path = getattr(settings, "ORDER_REMINDER_SENDER", "crm.reminders.LogSender")
+        sender = import_string(path)()
+    return asyncio.run(dispatch(sender, **options))
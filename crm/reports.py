@@ -0,0 +1,246 @@
+import heapq
+import json
+import math
+import os
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, time as day_time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import BigIntegerField, F
+from django.db.models.functions import Cast, Round
+from django.utils import timezone
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+from crm.products.models import Product
+
+# Orders per fetch; memory is bounded by this plus one entry per customer/product
+CHUNK_SIZE = 50000
+TOP = 10
+PERCENTILES = (50, 75, 90, 95, 99)
+# Order value histogram bounds, in cents
+ORDER_VALUE_BOUNDS = (1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000, 500000, 1000000)
+# Quantile buckets grow 1% per step, so percentiles are within ~0.5% of the exact value
+QUANTILE_GROWTH = 1.01
+
+
+def _cents(field):
+    # Rounded in SQL so rows come back as ints instead of a Decimal per value
+    return Cast(Round(F(field) * 100), BigIntegerField())
+
+
+def _money(cents):
+    return str(Decimal(int(cents)).scaleb(-2))
+
+
+def _columns(rows, *typecodes):
+    """Transpose a chunk of ``values_list`` tuples into one ``array`` per column."""
+    if not rows:
+        return tuple(array(code) for code in typecodes)
+    return tuple(array(code, column) for code, column in zip(typecodes, zip(*rows)))
+
+
+def geometric_bounds(growth=QUANTILE_GROWTH, limit=10 ** 12):
+    bounds = [1]
+    while bounds[-1] < limit:
+        bounds.append(max(bounds[-1] + 1, math.ceil(bounds[-1] * growth)))
+    return bounds
+
+
+class Buckets:
+    """Counts of integer values per ``[bounds[i-1], bounds[i])`` bucket.
+
+    ``add`` takes a whole column: it is sorted once and each bucket is counted
+    with a binary search, so the cost per chunk is one C-level sort plus a few
+    bisects per bucket instead of Python work per value.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = array("q", bounds)
+        self.counts = array("q", [0]) * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, values):
+        if not values:
+            return
+        values = sorted(values)
+        self.count += len(values)
+        self.total += sum(values)
+        self.min = values[0] if self.min is None else min(self.min, values[0])
+        self.max = values[-1] if self.max is None else max(self.max, values[-1])
+        # Only the buckets between the chunk's min and max can receive values
+        first = bisect_left(self.bounds, values[0] + 1)
+        last = bisect_left(self.bounds, values[-1] + 1)
+        below = 0
+        for i in range(first, last):
+            position = bisect_left(values, self.bounds[i])
+            self.counts[i] += position - below
+            below = position
+        self.counts[last] += len(values) - below
+
+    def quantile(self, q):
+        """Approximate ``q`` quantile: the midpoint of the bucket holding that rank."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen > rank:
+                break
+        low = self.bounds[i - 1] if i else 0
+        high = self.bounds[i] - 1 if i < len(self.bounds) else self.max
+        return min(max((low + high) // 2, self.min), self.max)
+
+    def histogram(self, label=str):
+        rows = []
+        for i, count in enumerate(self.counts):
+            low = label(self.bounds[i - 1]) if i else None
+            high = label(self.bounds[i]) if i < len(self.bounds) else None
+            rows.append({"from": low, "to": high, "count": count})
+        return rows
+
+
+def _order_chunks(orders, chunk_size):
+    """Yield ``(ids, customer_ids, cents)`` arrays, keyset-paginated on pk."""
+    rows = orders.annotate(cents=_cents("total_amount")).values_list("pk", "customer_id", "cents")
+    last = 0
+    while True:
+        chunk = list(rows.filter(pk__gt=last).order_by("pk")[:chunk_size])
+        if not chunk:
+            return
+        columns = _columns(chunk, "q", "q", "q")
+        del chunk
+        yield columns
+        last = columns[0][-1]
+
+
+def _percentiles(buckets):
+    return {f"p{p}": _money(buckets.quantile(p / 100)) for p in PERCENTILES if buckets.count}
+
+
+def _window(date_from, date_to):
+    """``order_date`` filter for the inclusive ``date_from..date_to`` day range."""
+    lookups = {}
+    if date_from is not None:
+        lookups["order_date__gte"] = timezone.make_aware(datetime.combine(date_from, day_time.min))
+    if date_to is not None:
+        end = datetime.combine(date_to + timedelta(days=1), day_time.min)
+        lookups["order_date__lt"] = timezone.make_aware(end)
+    return lookups
+
+
+def build_report(date_from=None, date_to=None, top=TOP, chunk_size=CHUNK_SIZE):
+    """Order value, basket size, customer and product statistics for a date range.
+
+    Orders and their product lines are read ``chunk_size`` orders at a time as
+    ``array`` columns. Order values are only kept as bucket counts, so memory
+    does not grow with the number of orders. Percentiles come from those
+    buckets; totals, counts and the histograms are exact.
+    """
+    started = time.perf_counter()
+    window = _window(date_from, date_to)
+    orders = Order.objects.filter(**window)
+    lines = Order.products.through.objects.all()
+    if window:
+        lines = lines.filter(**{f"order__{key}": value for key, value in window.items()})
+
+    values = Buckets(geometric_bounds())
+    value_histogram = Buckets(ORDER_VALUE_BOUNDS)
+    baskets = Counter()
+    units = Counter()
+    customer_revenue = {}
+    customer_orders = Counter()
+
+    for ids, customers, cents in _order_chunks(orders, chunk_size):
+        values.add(cents)
+        value_histogram.add(cents)
+        customer_orders.update(customers)
+        for customer, amount in zip(customers, cents):
+            customer_revenue[customer] = customer_revenue.get(customer, 0) + amount
+
+        # Every line of this chunk's orders, in one query on the (order, product) index
+        order_ids, product_ids = _columns(
+            list(
+                lines.filter(order_id__gte=ids[0], order_id__lte=ids[-1])
+                .values_list("order_id", "product_id")
+            ),
+            "q", "q",
+        )
+        units.update(product_ids)
+        sizes = Counter(order_ids)
+        baskets.update(sizes.values())
+        baskets[0] += len(ids) - len(sizes)
+
+    customer_values = Buckets(geometric_bounds())
+    customer_values.add(array("q", customer_revenue.values()))
+    top_customers = heapq.nlargest(top, customer_revenue.items(), key=lambda item: item[1])
+    names = dict(
+        Customer.objects.filter(pk__in=[pk for pk, _ in top_customers]).values_list("pk", "name")
+    )
+    top_products = units.most_common(top)
+    product_names = dict(
+        Product.objects.filter(pk__in=[pk for pk, _ in top_products]).values_list("pk", "name")
+    )
+    basket_items = sum(size * count for size, count in baskets.items())
+
+    return {
+        "generated_at": timezone.now().isoformat(),
+        "from": date_from.isoformat() if date_from else None,
+        "to": date_to.isoformat() if date_to else None,
+        "orders": {
+            "count": values.count,
+            "revenue": _money(values.total),
+            "average": _money(values.total // values.count) if values.count else None,
+            "min": _money(values.min) if values.count else None,
+            "max": _money(values.max) if values.count else None,
+            "percentiles": _percentiles(values),
+            "histogram": value_histogram.histogram(_money),
+        },
+        "baskets": {
+            "average_items": round(basket_items / values.count, 3) if values.count else None,
+            "sizes": {str(size): baskets[size] for size in sorted(baskets)},
+        },
+        "customers": {
+            "active": len(customer_revenue),
+            "revenue_percentiles": _percentiles(customer_values),
+            "top": [
+                {
+                    "id": pk,
+                    "name": names.get(pk),
+                    "orders": customer_orders[pk],
+                    "revenue": _money(amount),
+                }
+                for pk, amount in top_customers
+            ],
+        },
+        "products": {
+            "top": [
+                {"id": pk, "name": product_names.get(pk), "units": count}
+                for pk, count in top_products
+            ],
+        },
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def report_path(day=None):
+    directory = getattr(settings, "CRM_REPORT_DIR", "/tmp")
+    return os.path.join(directory, f"crm_report_{(day or timezone.localdate()).isoformat()}.json")
+
+
+def write_report(report, path=None):
+    """Write ``report`` as compact JSON (atomically) and return the path."""
+    path = path or report_path()
+    partial = f"{path}.partial"
+    with open(partial, "w") as f:
+        json.dump(report, f, separators=(",", ":"))
+    os.replace(partial, path)
+    return path
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+from graphene_django import DjangoObjectType
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    OperationType,
+    get_named_type,
+    is_composite_type,
+    print_ast,
+)
+
+from crm.db_routing import read_from_replica, routing_config
+
+TAG_PREFIX = "crm:gql:tag:"
+KEY_PREFIX = "crm:gql:resp:"
+DIRTY_PREFIX = "crm:gql:dirty:"
+
+
+def _config():
+    return getattr(settings, "GRAPHQL_RESPONSE_CACHE", {})
+
+
+def _cache():
+    return caches[_config().get("CACHE_ALIAS", "default")]
+
+
+def _fresh_version():
+    # Not a small counter: a tag evicted from the cache must never come back at an
+    # old version and revive entries cached under it
+    return time.time_ns()
+
+
+def invalidate(*tags):
+    """Bump the version of ``tags`` once the current transaction commits."""
+    def bump():
+        cache = _cache()
+        for tag in tags:
+            try:
+                cache.incr(TAG_PREFIX + tag)
+            except ValueError:
+                cache.set(TAG_PREFIX + tag, _fresh_version(), timeout=None)
+        routing = routing_config()
+        if routing["REPLICAS"]:
+            # Replicas may serve the old rows until they catch up (assumed within
+            # STICKY_SECONDS); their results must not be cached under the new version
+            lag = routing["STICKY_SECONDS"]
+            cache.set_many({DIRTY_PREFIX + tag: True for tag in tags}, timeout=lag)
+    transaction.on_commit(bump)
+
+
+def _tag_versions(cache, tags):
+    keys = [TAG_PREFIX + tag for tag in sorted(tags)]
+    versions = cache.get_many(keys)
+    missing = {key: _fresh_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def _models_in(schema, parent_type, selection_set, fragments, tags):
+    for sel in selection_set.selections:
+        if isinstance(sel, FragmentSpreadNode):
+            fragment = fragments.get(sel.name.value)
+            if fragment is not None:
+                cond = schema.get_type(fragment.type_condition.name.value) or parent_type
+                _models_in(schema, cond, fragment.selection_set, fragments, tags)
+            continue
+        if isinstance(sel, InlineFragmentNode):
+            cond = parent_type
+            if sel.type_condition is not None:
+                cond = schema.get_type(sel.type_condition.name.value) or parent_type
+            _models_in(schema, cond, sel.selection_set, fragments, tags)
+            continue
+        if not isinstance(sel, FieldNode):
+            continue
+        field = getattr(parent_type, "fields", {}).get(sel.name.value)
+        if field is None:
+            continue
+        named = get_named_type(field.type)
+        graphene_type = getattr(named, "graphene_type", None)
+        if isinstance(graphene_type, type) and issubclass(graphene_type, DjangoObjectType):
+            tags.add(graphene_type._meta.model.__name__)
+        if sel.selection_set is not None and is_composite_type(named):
+            _models_in(schema, named, sel.selection_set, fragments, tags)
+
+
+def user_key(request):
+    """The requesting user's part of a cache key; None when anonymous.
+
+    Loads the session and user on first use, so async code must call it via
+    ``sync_to_async``.
+    """
+    user = getattr(request, "user", None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+class ResponseCache:
+    """Opt-in cache for read-only query responses.
+
+    Entries are keyed by (normalized document, operation, variables, user) plus the
+    current version of every model tag the selection touches. Saving or deleting a
+    ``Customer``/``Product``/``Order`` bumps its tag, which orphans every entry that
+    read it; TTL and LRU culling come from the configured Django cache.
+    """
+
+    def tags_for(self, schema, document, operation):
+        """Return the model tags for ``operation`` or None when it must not be cached."""
+        if operation is None or operation.operation != OperationType.QUERY:
+            return None
+        config = _config()
+        allowed = set(config.get("FIELDS", ()))
+        fragments = {
+            d.name.value: d for d in document.definitions if d.kind == "fragment_definition"
+        }
+        tags = set()
+        for sel in operation.selection_set.selections:
+            if not isinstance(sel, FieldNode) or sel.name.value not in allowed:
+                return None
+        _models_in(schema, schema.query_type, operation.selection_set, fragments, tags)
+        return tags
+
+    def key(self, document, operation_name, variables, user_key, tags):
+        """``user_key`` comes from ``user_key(request)``."""
+        payload = json.dumps(
+            [print_ast(document), operation_name, variables or {}, user_key,
+             _tag_versions(_cache(), tags)],
+            sort_keys=True,
+            default=str,
+        )
+        return KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        return _cache().get(key)
+
+    def set(self, key, data, tags=()):
+        cache = _cache()
+        if tags and read_from_replica():
+            if cache.get_many([DIRTY_PREFIX + tag for tag in tags]):
+                return
+        cache.set(key, data, timeout=_config().get("TIMEOUT", DEFAULT_TIMEOUT))
+
+
+response_cache = ResponseCache()
@@ -1,6 +1,5 @@
 import graphene
 from graphene_django import DjangoObjectType
-from graphene_django.filter import DjangoFilterConnectionField
 
 
 import re
@@ -8,34 +7,76 @@ from decimal import Decimal, InvalidOperation
 import graphene
 from graphene import relay
 from graphene_django import DjangoObjectType
-from django.db import transaction
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.db.models import Q
+from django.db.models.functions import Lower
 from django.utils import timezone
+from graphql import GraphQLError
 
-from crm.customers.models import Customer
-from crm.products.models import Product
+from crm.customers.models import Customer, normalize_phone, phone_validator
+from crm.products.models import InsufficientStock, Product
 from crm.orders.models import Order
+from crm.stats.models import DashboardCounter
+from crm.stats.rollups import sales_analytics
+from crm.orders.schema import Query as OrdersQuery
 from .filters import CustomerFilter as CustomerFilterSet, ProductFilter as ProductFilterSet, OrderFilter as OrderFilterSet
+from .pagination import CountableConnection, KeysetConnectionField
+from .response_cache import invalidate
+from .async_resolvers import async_capable, executing_async
+from .loaders import get_loaders, load, prefetched
+from .optimizer import optimize
+
+
+class OrderRelationsMixin:
+    # Batched through the per-request loaders instead of one query per order,
+    # unless the optimizer already joined/prefetched the relation
+    @async_capable
+    def resolve_customer(self, info):
+        if Order.customer.is_cached(self):
+            return self.customer
+        return load(info, get_loaders(info).customer, self.customer_id)
+
+    @async_capable
+    def resolve_products(self, info):
+        products = prefetched(self, "products")
+        if products is not None:
+            get_loaders(info).prime(products)
+            return products
+        return load(info, get_loaders(info).order_products, self.pk)
+
+
+class ProductRelationsMixin:
+    @async_capable
+    def resolve_orders(self, info):
+        orders = prefetched(self, "orders")
+        if orders is not None:
+            get_loaders(info).prime(orders)
+            return orders
+        return load(info, get_loaders(info).product_orders, self.pk)
 
 
 class CustomerNode(DjangoObjectType):
     class Meta:
         model = Customer
         interfaces = (relay.Node,)
+        connection_class = CountableConnection
         fields = ("id", "name", "email", "phone", "created_at")
 
 
-class ProductNode(DjangoObjectType):
+class ProductNode(ProductRelationsMixin, DjangoObjectType):
     class Meta:
         model = Product
         interfaces = (relay.Node,)
-        fields = ("id", "name", "price", "stock")
+        connection_class = CountableConnection
+        fields = ("id", "name", "price", "stock", "orders")
 
 
-class OrderNode(DjangoObjectType):
+class OrderNode(OrderRelationsMixin, DjangoObjectType):
     class Meta:
         model = Order
         interfaces = (relay.Node,)
+        connection_class = CountableConnection
         fields = ("id", "order_date", "status", "total_amount", "customer", "products")
 
 
@@ -65,19 +106,25 @@ class OrderFilterInput(graphene.InputObjectType):
     product_id = graphene.ID()
 
 
+class OrderInput(graphene.InputObjectType):
+    customer_id = graphene.ID(required=True)
+    product_ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+    order_date = graphene.DateTime()
+
+
 class CustomerType(DjangoObjectType):
     class Meta:
         model = Customer
         fields = ("id", "name", "email", "phone", "created_at")
 
 
-class ProductType(DjangoObjectType):
+class ProductType(ProductRelationsMixin, DjangoObjectType):
     class Meta:
         model = Product
-        fields = ("id", "name", "price", "stock")
+        fields = ("id", "name", "price", "stock", "orders")
 
 
-class OrderType(DjangoObjectType):
+class OrderType(OrderRelationsMixin, DjangoObjectType):
     class Meta:
         model = Order
         fields = ("id", "order_date", "status", "total_amount", "customer", "products")
@@ -97,7 +144,9 @@ class CreateCustomer(graphene.Mutation):
     @staticmethod
     def mutate(root, info, name, email, phone=None):
         errors = []
-        if Customer.objects.filter(email__iexact=email).exists():
+        if Customer.objects.annotate(email_lower=Lower("email")).filter(
+            email_lower=email.lower()
+        ).exists():
             errors.append("Email already exists")
         phone_regex = re.compile(r"^(\+\d{7,15}|\d{3}-\d{3}-\d{4})$")
         if phone and not phone_regex.match(phone):
@@ -117,24 +166,96 @@ class BulkCreateCustomers(graphene.Mutation):
     message = graphene.String()
     success = graphene.Boolean()
 
+    # Rows per IN lookup / INSERT statement; keeps SQLite under its variable limit
+    BATCH_SIZE = 500
+
     @staticmethod
-    def mutate(root, info, customers):
-        created_objs = []
-        errors = []
+    def _validate(customers):
+        """Validate every row in memory; return ([(idx, Customer)], {idx: error})."""
+        valid = []
+        errors = {}
+        seen = {}
         for idx, data in enumerate(customers):
             try:
+                if not isinstance(data, dict):
+                    raise ValueError("customer must be an object")
                 name = data.get("name")
                 email = data.get("email")
                 phone = data.get("phone")
                 if not name or not email:
                     raise ValueError("name and email required")
-                if Customer.objects.filter(email__iexact=email).exists():
-                    raise ValueError(f"Email already exists: {email}")
-                obj = Customer(name=name, email=email, phone=phone)
-                obj.save()
-                created_objs.append(obj)
+                if phone:
+                    try:
+                        phone_validator(phone)
+                    except ValidationError as e:
+                        raise ValueError(e.messages[0]) from e
+                key = email.lower()
+                if key in seen:
+                    raise ValueError(f"Duplicate email in batch (index {seen[key]}): {email}")
+                seen[key] = idx
+                # bulk_create bypasses save(), so normalize the phone here
+                customer = Customer(
+                    name=name, email=email, phone=phone, phone_digits=normalize_phone(phone)
+                )
+                valid.append((idx, customer))
             except Exception as e:  # pylint: disable=broad-except
-                errors.append(f"Index {idx}: {e}")
+                errors[idx] = str(e)
+        return valid, errors
+
+    @classmethod
+    def _existing_emails(cls, emails):
+        existing = set()
+        for start in range(0, len(emails), cls.BATCH_SIZE):
+            chunk = emails[start:start + cls.BATCH_SIZE]
+            existing.update(
+                Customer.objects.annotate(email_lower=Lower("email"))
+                .filter(email_lower__in=chunk)
+                .values_list("email_lower", flat=True)
+            )
+        return existing
+
+    @classmethod
+    def _insert(cls, rows, errors):
+        created = []
+        for start in range(0, len(rows), cls.BATCH_SIZE):
+            chunk = rows[start:start + cls.BATCH_SIZE]
+            try:
+                with transaction.atomic():
+                    created.extend(Customer.objects.bulk_create([obj for _, obj in chunk]))
+                    # bulk_create sends no post_save, so keep the dashboard counter in step here
+                    DashboardCounter.objects.bump(DashboardCounter.CUSTOMERS, len(chunk))
+                continue
+            except IntegrityError:
+                pass
+            # A concurrent writer took one of the emails; isolate it row by row
+            for idx, obj in chunk:
+                try:
+                    with transaction.atomic():
+                        obj.save(force_insert=True)
+                    created.append(obj)
+                except IntegrityError:
+                    errors[idx] = f"Email already exists: {obj.email}"
+        return created
+
+    @classmethod
+    def mutate(cls, root, info, customers):
+        valid, errors = cls._validate(customers)
+        # Lower-cased like the in-batch check, so the lookup can use customer_email_lower_idx.
+        # SQLite's LOWER() only folds ASCII: a stored email differing from the input only
+        # in non-ASCII case is not caught here, but its exact duplicate still fails the
+        # unique constraint in _insert and is reported the same way
+        existing = cls._existing_emails([obj.email.lower() for _, obj in valid])
+        rows = []
+        for idx, obj in valid:
+            if obj.email.lower() in existing:
+                errors[idx] = f"Email already exists: {obj.email}"
+            else:
+                rows.append((idx, obj))
+        with transaction.atomic():
+            created_objs = cls._insert(rows, errors)
+            if created_objs:
+                invalidate("Customer")
+        errors = [f"Index {idx}: {errors[idx]}" for idx in sorted(errors)]
         return BulkCreateCustomers(
             created=created_objs,
             errors=errors,
@@ -186,19 +307,130 @@ class CreateOrder(graphene.Mutation):
             customer = Customer.objects.get(pk=customer_id)
         except Customer.DoesNotExist:
             return CreateOrder(success=False, errors=["Customer not found"], message="Order failed")
-        products = list(Product.objects.filter(pk__in=product_ids))
-        if len(products) != len(set(product_ids)):
-            errors.append("Some products not found")
-        if errors:
-            return CreateOrder(success=False, errors=errors, message="Order failed")
+        except (ValidationError, ValueError):
+            return CreateOrder(
+                success=False, errors=["Invalid customer or product ID"], message="Order failed"
+            )
         with transaction.atomic():
-            order = Order.objects.create(customer=customer, order_date=timezone.now())
-            order.products.set(products)
-            order.calculate_total()
-            order.save(update_fields=["total_amount"])
+            try:
+                Product.objects.reserve(product_ids)
+            except (ValidationError, ValueError):
+                return CreateOrder(
+                    success=False, errors=["Invalid customer or product ID"], message="Order failed"
+                )
+            except InsufficientStock as e:
+                if e.missing:
+                    errors.append("Some products not found")
+                if e.short:
+                    short = ", ".join(map(str, e.short))
+                    errors.append(f"Insufficient stock for products: {short}")
+                return CreateOrder(success=False, errors=errors, message="Order failed")
+            # Read after the decrement so the response carries the reserved stock
+            products = list(Product.objects.filter(pk__in=product_ids))
+            order = Order(customer=customer, order_date=timezone.now())
+            order.calculate_total(products)
+            order.save()
+            # New order: nothing to diff and the total is already set, so write the
+            # through rows directly rather than via products.set() and m2m_changed
+            through = Order.products.through
+            through.objects.bulk_create([through(order=order, product=p) for p in products])
+            invalidate("Product")
+        get_loaders(info).order_products.prime(order.pk, products)
         return CreateOrder(success=True, order=order, errors=None, message="Order created")
 
 
+class BulkCreateOrders(graphene.Mutation):
+    class Arguments:
+        orders = graphene.List(graphene.NonNull(OrderInput), required=True)
+
+    created = graphene.List(OrderType)
+    errors = graphene.List(graphene.String)
+    message = graphene.String()
+    success = graphene.Boolean()
+
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def _parse(orders):
+        """Return ([(idx, customer_id, [product_id], order_date)], {idx: error})."""
+        rows = []
+        errors = {}
+        for idx, data in enumerate(orders):
+            try:
+                customer_id = int(data.customer_id)
+                product_ids = list(dict.fromkeys(int(pk) for pk in data.product_ids))
+            except (TypeError, ValueError):
+                errors[idx] = "Invalid customer or product ID"
+                continue
+            if not product_ids:
+                errors[idx] = "At least one product is required"
+                continue
+            rows.append((idx, customer_id, product_ids, data.order_date))
+        return rows, errors
+
+    @classmethod
+    def _reserve(cls, rows, customers, products, errors):
+        """Pick the rows that can be placed, taking one unit of stock per product."""
+        accepted = []
+        for idx, customer_id, product_ids, order_date in rows:
+            customer = customers.get(customer_id)
+            if customer is None:
+                errors[idx] = "Customer not found"
+                continue
+            missing = [pk for pk in product_ids if pk not in products]
+            if missing:
+                errors[idx] = f"Products not found: {', '.join(map(str, missing))}"
+                continue
+            short = [pk for pk in product_ids if products[pk].stock < 1]
+            if short:
+                errors[idx] = f"Insufficient stock for products: {', '.join(map(str, short))}"
+                continue
+            chosen = [products[pk] for pk in product_ids]
+            for product in chosen:
+                product.stock -= 1
+            order = Order(customer=customer, order_date=order_date or timezone.now())
+            order.calculate_total(chosen)
+            accepted.append((order, chosen))
+        return accepted
+
+    @classmethod
+    def mutate(cls, root, info, orders):
+        rows, errors = cls._parse(orders)
+        customers = Customer.objects.in_bulk({customer_id for _, customer_id, _, _ in rows})
+        product_ids = {pk for _, _, pks, _ in rows for pk in pks}
+        with transaction.atomic():
+            # Locked so the stock checked here is the stock that gets written back
+            products = Product.objects.select_for_update().in_bulk(product_ids)
+            accepted = cls._reserve(rows, customers, products, errors)
+            created = Order.objects.bulk_create(
+                [order for order, _ in accepted], batch_size=cls.BATCH_SIZE
+            )
+            through = Order.products.through
+            through.objects.bulk_create(
+                [through(order=order, product=p) for order, chosen in accepted for p in chosen],
+                batch_size=cls.BATCH_SIZE,
+            )
+            reserved = {p.pk: p for _, chosen in accepted for p in chosen}
+            Product.objects.bulk_update(reserved.values(), ["stock"], batch_size=cls.BATCH_SIZE)
+            if created:
+                # bulk_create sends no post_save/m2m_changed; keep counters and caches in step
+                DashboardCounter.objects.bump(DashboardCounter.ORDERS, len(created))
+                DashboardCounter.objects.bump(
+                    DashboardCounter.REVENUE, sum(order.total_amount for order in created)
+                )
+                invalidate("Order", "Product")
+        loaders = get_loaders(info)
+        for order, chosen in accepted:
+            loaders.order_products.prime(order.pk, chosen)
+        errors = [f"Index {idx}: {errors[idx]}" for idx in sorted(errors)]
+        return BulkCreateOrders(
+            created=created,
+            errors=errors,
+            success=len(errors) == 0,
+            message=f"Created {len(created)} orders, {len(errors)} errors",
+        )
+
+
 class UpdateLowStockProducts(graphene.Mutation):
     class Arguments:
         increment_by = graphene.Int(required=False, default_value=10)
@@ -210,63 +442,106 @@ class UpdateLowStockProducts(graphene.Mutation):
 
     @classmethod
     def mutate(cls, root, info, increment_by=10, threshold=10):
-        to_update = Product.objects.filter(stock__lt=threshold)
-        updated = []
-        for p in to_update:
-            p.stock = (p.stock or 0) + increment_by
-            p.save(update_fields=["stock"])
-            updated.append(p)
+        # One set-based UPDATE instead of a save() per product
+        updated = Product.objects.restock_below(threshold, increment_by)
+        if updated:
+            invalidate("Product")
         msg = f"Updated {len(updated)} low-stock products"
         return UpdateLowStockProducts(ok=True, message=msg, updated_products=updated)
 
 
-class Query(graphene.ObjectType):
+def _read_counter(info, name, exact, cast):
+    if executing_async(info):
+        async def aread():
+            return cast(await DashboardCounter.objects.aread(name, exact=exact))
+        return aread()
+    return cast(DashboardCounter.objects.read(name, exact=exact))
+
+
+class SalesGroupBy(graphene.Enum):
+    DAY = "day"
+    PRODUCT = "product"
+    CUSTOMER = "customer"
+    STATUS = "status"
+
+
+class SalesBucket(graphene.ObjectType):
+    key = graphene.String(required=True)
+    label = graphene.String()
+    orders = graphene.Int()
+    units = graphene.Int()
+    revenue = graphene.Decimal(
+        description=(
+            "Sum of order totals. With groupBy: PRODUCT, units at the product's current "
+            "list price instead, which need not add up to order revenue."
+        )
+    )
+
+
+class Query(OrdersQuery, graphene.ObjectType):
     hello = graphene.String(description="Simple hello field")
     # Legacy hello retained; introduce filtered connection fields using django-filter
-    all_customers = DjangoFilterConnectionField(
+    all_customers = KeysetConnectionField(
         CustomerNode, filterset_class=CustomerFilterSet, order_by=graphene.List(graphene.String)
     )
-    all_products = DjangoFilterConnectionField(
+    all_products = KeysetConnectionField(
         ProductNode, filterset_class=ProductFilterSet, order_by=graphene.List(graphene.String)
     )
-    all_orders = DjangoFilterConnectionField(
+    all_orders = KeysetConnectionField(
         OrderNode, filterset_class=OrderFilterSet, order_by=graphene.List(graphene.String)
     )
-    customers_count = graphene.Int(name='customersCount')
-    orders_count = graphene.Int(name='ordersCount')
-    orders_revenue = graphene.Float(name='ordersRevenue')
+    customers_count = graphene.Int(
+        name='customersCount', exact=graphene.Boolean(default_value=False)
+    )
+    orders_count = graphene.Int(name='ordersCount', exact=graphene.Boolean(default_value=False))
+    orders_revenue = graphene.Float(
+        name='ordersRevenue', exact=graphene.Boolean(default_value=False)
+    )
+    # Daily rollups kept by crm.stats.rollups (refresh_sales_rollups), never the order tables
+    sales_analytics = graphene.List(
+        graphene.NonNull(SalesBucket),
+        group_by=SalesGroupBy(required=True),
+        from_=graphene.Date(required=True, name='from'),
+        to=graphene.Date(required=True),
+        limit=graphene.Int(),
+    )
 
     def resolve_hello(root, info):
         return "Hello, GraphQL!"
 
+    # orderBy is applied by the connection field's filterset (OrderingFilter, "-a,b" syntax)
     def resolve_all_customers(root, info, order_by=None, **kwargs):
         qs = CustomerFilterSet(data=kwargs, queryset=Customer.objects.all()).qs
-        if order_by:
-            qs = qs.order_by(*order_by)
-        return qs
+        return optimize(qs, info)
 
     def resolve_all_products(root, info, order_by=None, **kwargs):
         qs = ProductFilterSet(data=kwargs, queryset=Product.objects.all()).qs
-        if order_by:
-            qs = qs.order_by(*order_by)
-        return qs
+        return optimize(qs, info)
 
     def resolve_all_orders(root, info, order_by=None, **kwargs):
         qs = OrderFilterSet(data=kwargs, queryset=Order.objects.all()).qs
-        if order_by:
-            qs = qs.order_by(*order_by)
-        return qs
+        return optimize(qs, info)
+
+    # Precomputed counters; exact: true recomputes from the tables (and stores the result)
+    @async_capable
+    def resolve_customers_count(root, info, exact=False):
+        return _read_counter(info, DashboardCounter.CUSTOMERS, exact, int)
 
-    def resolve_customers_count(root, info):
-        return Customer.objects.count()
+    @async_capable
+    def resolve_orders_count(root, info, exact=False):
+        return _read_counter(info, DashboardCounter.ORDERS, exact, int)
 
-    def resolve_orders_count(root, info):
-        return Order.objects.count()
+    @async_capable
+    def resolve_orders_revenue(root, info, exact=False):
+        return _read_counter(info, DashboardCounter.REVENUE, exact, float)
 
-    def resolve_orders_revenue(root, info):
-        from django.db.models import Sum
-        agg = Order.objects.aggregate(total=Sum('total_amount'))
-        return float(agg.get('total') or 0)
+    def resolve_sales_analytics(root, info, group_by, from_, to, limit=None):
+        if from_ > to:
+            raise GraphQLError("from must not be after to")
+        if limit is not None and limit < 1:
+            raise GraphQLError("limit must be positive")
+        rows = sales_analytics(group_by.value, from_, to, limit)
+        return [SalesBucket(**row) for row in rows]
 
 
 class Mutation(graphene.ObjectType):
@@ -274,6 +549,7 @@ class Mutation(graphene.ObjectType):
     bulk_create_customers = BulkCreateCustomers.Field()
     create_product = CreateProduct.Field()
     create_order = CreateOrder.Field()
+    bulk_create_orders = BulkCreateOrders.Field()
     update_low_stock_products = UpdateLowStockProducts.Field()
 
 
@@ -0,0 +1,83 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from crm.customers.models import Customer
+from crm.products.models import Product
+
+# model -> (SQLite FTS5 table, indexed columns); the tables and their sync triggers
+# are created by the customers/products search migrations
+SEARCHABLE = {
+    Customer: ("customers_customer_fts", ("name", "email")),
+    Product: ("products_product_fts", ("name",)),
+}
+
+RANK = "search_rank"
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(text):
+    return _TOKEN.findall(text or "")
+
+
+def _sqlite_search(queryset, table, tokens):
+    # Every token as a quoted prefix term: search-as-you-type, and user input can
+    # never inject FTS5 query syntax
+    match = " ".join(f'"{token}"*' for token in tokens)
+    opts = queryset.model._meta
+    # Joined on rowid, so MATCH runs once and each row's bm25 rank (lower is better)
+    # comes with it, instead of a correlated MATCH per row for the rank
+    queryset = queryset.extra(
+        tables=[table],
+        where=[f"{table} MATCH %s", f"{table}.rowid = {opts.db_table}.{opts.pk.column}"],
+        params=[match],
+    )
+    return queryset.annotate(**{RANK: RawSQL(f"{table}.rank", [])})
+
+
+def _postgres_search(queryset, columns, tokens):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    vector = search_vector(columns)
+    query = SearchQuery(
+        " & ".join(f"{token}:*" for token in tokens), config="simple", search_type="raw"
+    )
+    return queryset.annotate(_search_vector=vector).filter(_search_vector=query).annotate(
+        **{RANK: -SearchRank(vector, query)}
+    )
+
+
+def search_vector(columns):
+    """The tsvector expression indexed by the PostgreSQL search migrations."""
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector(*columns, config="simple")
+
+
+def search(queryset, text):
+    """Restrict ``queryset`` to full-text matches for ``text``, best matches first.
+
+    Rows are annotated with ``search_rank`` (lower is better). Backends without a
+    search index fall back to ``icontains`` on the indexed columns.
+    """
+    tokens = _tokens(text)
+    if not tokens:
+        return queryset
+    if RANK in queryset.query.annotations:
+        return queryset
+    table, columns = SEARCHABLE[queryset.model]
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite":
+        queryset = _sqlite_search(queryset, table, tokens)
+    elif vendor == "postgresql":
+        queryset = _postgres_search(queryset, columns, tokens)
+    else:
+        for token in tokens:
+            condition = Q()
+            for column in columns:
+                condition |= Q(**{f"{column}__icontains": token})
+            queryset = queryset.filter(condition)
+        return queryset
+    return queryset.order_by(RANK, "pk")
@@ -18,19 +18,23 @@ INSTALLED_APPS = [
     'django_filters',
     'django_crontab',
     'django_celery_beat',
+    'crm',
     'crm.customers',
     'crm.products',
     'crm.orders',
+    'crm.stats',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'crm.db_routing.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'crm.instrumentation.QueryMetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'crm.urls'
@@ -53,11 +57,37 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'crm.wsgi.application'
 
+# Connections are kept for CONN_MAX_AGE seconds and checked before reuse
+DB_CONN_MAX_AGE = int(os.environ.get('CRM_DB_CONN_MAX_AGE', 60))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Read replicas (crm.db_routing). Locally, CRM_SQLITE_REPLICAS=N adds N read-only SQLite files
+# that `manage.py sync_sqlite_replicas` fills with a copy of the primary
+for i in range(1, int(os.environ.get('CRM_SQLITE_REPLICAS', 0)) + 1):
+    DATABASES[f'replica{i}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f"file:{BASE_DIR / f'db_replica{i}.sqlite3'}?mode=ro",
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['crm.db_routing.PrimaryReplicaRouter']
+# Reads of a request go to one healthy replica until it writes; mutations, transactions and
+# clients that wrote in the last STICKY_SECONDS use the primary
+DATABASE_ROUTING = {
+    'PRIMARY': 'default',
+    'REPLICAS': [alias for alias in DATABASES if alias != 'default'],
+    'STICKY_SECONDS': 10,
+    'HEALTH_CHECK_INTERVAL': 5,
 }
 
 AUTH_PASSWORD_VALIDATORS = []
@@ -70,13 +100,91 @@ USE_TZ = True
 STATIC_URL = 'static/'
 
 GRAPHENE = {
-    'SCHEMA': 'crm.schema.schema'
+    'SCHEMA': 'crm.schema.schema',
+    'MIDDLEWARE': ['crm.instrumentation.ResolverTimingMiddleware'],
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # GraphQL response cache: TTL plus LRU culling. Use a shared backend (e.g. Redis)
+    # in production so tag invalidation reaches every worker.
+    'graphql': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'graphql-responses',
+        'TIMEOUT': 60,
+        'OPTIONS': {'MAX_ENTRIES': 1000, 'CULL_FREQUENCY': 4},
+    },
+}
+
+# Opt-in response cache (crm.response_cache); a query is cached only if every
+# root field is listed in FIELDS
+GRAPHQL_RESPONSE_CACHE = {
+    'CACHE_ALIAS': 'graphql',
+    'FIELDS': ['allProducts', 'allCustomers', 'pendingOrdersLastWeek'],
+}
+
+# Parsed/validated document LRU and automatic persisted queries (crm.views.CachedGraphQLView)
+GRAPHQL_DOCUMENT_CACHE_SIZE = 256
+GRAPHQL_PERSISTED_QUERIES_FILE = BASE_DIR / 'persisted_queries.json'
+# Reject any query whose hash is not in the allowlist file
+GRAPHQL_PERSISTED_QUERIES_ONLY = False
+
+# Admission control for /graphql (crm.query_cost): operations are priced in estimated rows
+# (connection first/last, LIST_SIZES for unpaginated lists, multiplied through nesting) and
+# rejected before execution above MAX_COST, MAX_DEPTH or a first/last over MAX_PAGE_SIZE
+GRAPHQL_QUERY_COST = {
+    'MAX_DEPTH': 12,
+    'MAX_PAGE_SIZE': 100,
+    'MAX_COST': 10000,
+    'DEFAULT_LIST_SIZE': 20,
+    'LIST_SIZES': {
+        'Query.pendingOrdersLastWeek': 500,
+        'OrderNode.products': 5,
+        'OrderType.products': 5,
+        'ProductNode.orders': 200,
+        'ProductType.orders': 200,
+    },
+}
+
+# Serve /graphql with crm.views.AsyncGraphQLView: None follows the entry point (async under
+# crm/asgi.py, e.g. uvicorn crm.asgi:application; sync under WSGI/runserver), True/False force it.
+# Sync resolvers run on a pool of GRAPHQL_ASYNC_THREADS threads, each with its own DB connection
+GRAPHQL_ASYNC = None
+GRAPHQL_ASYNC_THREADS = 8
+
+# Per-request SQL/resolver timings (crm.instrumentation): histograms are served at /metrics,
+# and a request sent with an X-GraphQL-Debug header gets them back under extensions.metrics
+GRAPHQL_INSTRUMENTED_PATHS = ['/graphql']
+GRAPHQL_DEBUG_EXTENSIONS = DEBUG
+# Operation names outside the persisted allowlist get their own series up to this many;
+# later ones are counted under "other"
+GRAPHQL_METRICS_MAX_OPERATIONS = 100
+# /metrics is served to staff users, INTERNAL_IPS and requests with "Authorization: Bearer <token>"
+METRICS_TOKEN = os.environ.get('CRM_METRICS_TOKEN')
+
+# Daily sales rollups (crm.stats.rollups): each refresh recomputes the days from the previous
+# order_date high-water mark minus this many days, so recent status changes are picked up
+SALES_ROLLUP_LOOKBACK_DAYS = 2
+
+# Where generate_crm_report writes crm_report_<date>.json (crm.reports)
+CRM_REPORT_DIR = '/tmp'
+
+# Notification backend for crm.reminders (an async context manager with async send(reminder))
+ORDER_REMINDER_SENDER = 'crm.reminders.LogSender'
+
+# crm.jobs: cron/Celery jobs run their GraphQL documents in-process, falling back to
+# GRAPHQL_JOBS_ENDPOINT over a pooled HTTP session; set False to always POST there
+GRAPHQL_JOBS_IN_PROCESS = True
+GRAPHQL_JOBS_ENDPOINT = 'http://localhost:8000/graphql'
+
 # Cron jobs (tasks 2 and 3)
 CRONJOBS = [
     ('*/5 * * * *', 'crm.cron.log_crm_heartbeat'),
     ('0 */12 * * *', 'crm.cron.update_low_stock'),
+    ('15 * * * *', 'crm.cron.reconcile_dashboard_counters'),
+    ('*/30 * * * *', 'crm.cron.refresh_sales_rollups'),
 ]
 
 # Celery settings
@@ -0,0 +1,30 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+from crm.orders.signals import order_totals_shifted
+from crm.products.models import Product
+from .response_cache import invalidate
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Order)
+def invalidate_model_responses(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate(sender.__name__)
+
+
+@receiver(m2m_changed, sender=Order.products.through)
+def invalidate_order_products(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate(Order.__name__)
+
+
+@receiver(order_totals_shifted)
+def invalidate_order_totals(sender, **kwargs):
+    invalidate(Order.__name__)
@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import DashboardCounter, RollupWatermark
+
+
+@admin.register(DashboardCounter)
+class DashboardCounterAdmin(admin.ModelAdmin):
+    list_display = ("name", "value", "updated_at")
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("name", "high_water", "last_order_id", "updated_at")
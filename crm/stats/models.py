@@ -0,0 +1,140 @@
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.db import models, router, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+from crm.products.models import Product
+
+
+def _live_customers():
+    return Decimal(Customer.objects.count())
+
+
+def _live_orders():
+    return Decimal(Order.objects.count())
+
+
+def _live_revenue():
+    return Order.objects.aggregate(total=Sum("total_amount"))["total"] or Decimal("0")
+
+
+class DashboardCounterManager(models.Manager):
+    def compute(self, name):
+        return DashboardCounter.LIVE[name]()
+
+    def read(self, name, exact=False):
+        """Return the stored counter, recomputing (and storing) it when asked or missing."""
+        if not exact:
+            value = self.filter(name=name).values_list("value", flat=True).first()
+            if value is not None:
+                return value
+        # In a transaction on the primary, so a lagging read replica is not stored
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            value = self.compute(name)
+            self.update_or_create(name=name, defaults={"value": value})
+        return value
+
+    async def aread(self, name, exact=False):
+        if not exact:
+            value = await self.filter(name=name).values_list("value", flat=True).afirst()
+            if value is not None:
+                return value
+        return await sync_to_async(self.read)(name, exact=True)
+
+    def bump(self, name, delta):
+        # Atomic in-place increment; a missing row is filled lazily on next read
+        if delta:
+            self.filter(name=name).update(value=F("value") + delta, updated_at=timezone.now())
+
+    def reconcile(self):
+        """Recompute every counter from the source tables; returns {name: value}."""
+        values = {}
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            for name in DashboardCounter.LIVE:
+                values[name] = self.compute(name)
+                self.update_or_create(name=name, defaults={"value": values[name]})
+        return values
+
+
+class DashboardCounter(models.Model):
+    CUSTOMERS = "customers"
+    ORDERS = "orders"
+    REVENUE = "revenue"
+    LIVE = {
+        CUSTOMERS: _live_customers,
+        ORDERS: _live_orders,
+        REVENUE: _live_revenue,
+    }
+
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DashboardCounterManager()
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):  # pragma: no cover - trivial
+        return f"{self.name}={self.value}"
+
+
+class RollupWatermark(models.Model):
+    """Latest ``Order.order_date`` (and order pk) folded into a set of rollups."""
+
+    name = models.CharField(max_length=50, unique=True)
+    high_water = models.DateTimeField(null=True, blank=True)
+    last_order_id = models.BigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):  # pragma: no cover - trivial
+        return f"{self.name}@{self.high_water}"
+
+
+class DailySales(models.Model):
+    day = models.DateField()
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class DailyProductSales(DailySales):
+    # No FK constraint: history outlives deleted products
+    product = models.ForeignKey(
+        Product, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(fields=["day", "product"], name="daily_product_sales_uniq")
+        ]
+
+
+class DailyCustomerSales(DailySales):
+    customer = models.ForeignKey(
+        Customer, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(fields=["day", "customer"], name="daily_customer_sales_uniq")
+        ]
+
+
+class DailyStatusSales(DailySales):
+    status = models.CharField(max_length=50)
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(fields=["day", "status"], name="daily_status_sales_uniq")
+        ]
@@ -0,0 +1,185 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, DateField, Max, Min, Q, Sum
+from django.db.models.functions import Substr, TruncDate
+from django.utils import timezone
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+from crm.products.models import Product
+from .models import DailyCustomerSales, DailyProductSales, DailyStatusSales, RollupWatermark
+
+WATERMARK = "daily_sales"
+ROLLUPS = (DailyProductSales, DailyCustomerSales, DailyStatusSales)
+CENT = Decimal("0.01")
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _day(date_field):
+    if connection.vendor == "sqlite" and timezone.get_current_timezone_name() == "UTC":
+        # SQLite runs TruncDate as a Python function per row; stored UTC timestamps
+        # are ISO text that already starts with the date
+        return Substr(date_field, 1, 10, output_field=DateField())
+    return TruncDate(date_field)
+
+
+def _by_day(queryset, date_field, *dimensions, **aggregates):
+    return (
+        queryset.annotate(day=_day(date_field))
+        .values("day", *dimensions)
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+
+def _dated(since, days, prefix=""):
+    """Q for orders dated on/after day ``since`` or on any of ``days``."""
+    field = f"{prefix}order_date"
+    q = Q(**{f"{field}__gte": _day_start(since)})
+    for day in days:
+        q |= Q(**{f"{field}__gte": _day_start(day), f"{field}__lt": _day_start(day + timedelta(1))})
+    return q
+
+
+def _build(since, days=()):
+    """Aggregate the orders selected by ``_dated(since, days)`` into rollup rows."""
+    orders = Order.objects.filter(_dated(since, days))
+    lines = Order.products.through.objects.filter(_dated(since, days, prefix="order__"))
+    # Order lines store no price, so product revenue is units at each product's list
+    # price as of this refresh. It is a per-product figure only and does not add up to
+    # order revenue; day/customer/status revenue comes from the stored order totals.
+    product_rows = [
+        DailyProductSales(
+            day=row["day"], product_id=row["product_id"],
+            orders=row["orders"], units=row["units"], revenue=row["revenue"] or Decimal("0"),
+        )
+        for row in _by_day(
+            lines, "order__order_date", "product_id",
+            orders=Count("order_id", distinct=True), units=Count("pk"),
+            revenue=Sum("product__price"),
+        )
+    ]
+
+    def merged(model, dimension, line_dimension):
+        # Order counts/revenue and line counts come from separate GROUP BYs; a join
+        # would repeat each order's total once per product
+        units = {
+            (row["day"], row[line_dimension]): row["units"]
+            for row in _by_day(lines, "order__order_date", line_dimension, units=Count("pk"))
+        }
+        return [
+            model(
+                day=row["day"], **{dimension: row[dimension]},
+                orders=row["orders"], revenue=row["revenue"] or Decimal("0"),
+                units=units.get((row["day"], row[dimension]), 0),
+            )
+            for row in _by_day(
+                orders, "order_date", dimension,
+                orders=Count("pk"), revenue=Sum("total_amount"),
+            )
+        ]
+
+    return {
+        DailyProductSales: product_rows,
+        DailyCustomerSales: merged(DailyCustomerSales, "customer_id", "order__customer_id"),
+        DailyStatusSales: merged(DailyStatusSales, "status", "order__status"),
+    }
+
+
+def refresh_sales_rollups(rebuild=False, lookback_days=None):
+    """Bring the daily sales rollups up to date; returns a summary dict.
+
+    Starts from the ``order_date`` high-water mark of the previous run, minus
+    ``SALES_ROLLUP_LOOKBACK_DAYS`` whole days for recent status changes, plus
+    the days of any order inserted since the last run with an older date. The
+    affected days are replaced, not added to, so reruns are idempotent.
+    ``rebuild`` recomputes all history (needed after edits to older orders).
+    """
+    if lookback_days is None:
+        lookback_days = getattr(settings, "SALES_ROLLUP_LOOKBACK_DAYS", 2)
+    with transaction.atomic():
+        watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=WATERMARK)
+        bounds = Order.objects.aggregate(
+            first=Min("order_date"), last=Max("order_date"), last_id=Max("pk")
+        )
+        rebuild = rebuild or watermark.high_water is None
+        start = bounds["first"] if rebuild else watermark.high_water
+        since, late_days = None, set()
+        if start is not None:
+            since = timezone.localdate(start) - timedelta(days=0 if rebuild else lookback_days)
+        if not rebuild and watermark.last_order_id is not None:
+            late = Order.objects.filter(
+                pk__gt=watermark.last_order_id, order_date__lt=_day_start(since)
+            )
+            late_days = {timezone.localdate(d) for d in late.values_list("order_date", flat=True)}
+
+        rows = 0
+        built = _build(since, late_days) if since is not None else {}
+        for model in ROLLUPS:
+            if rebuild:
+                stale = model.objects.all()
+            else:
+                stale = model.objects.filter(Q(day__gte=since) | Q(day__in=late_days))
+            stale.delete()
+            model.objects.bulk_create(built.get(model, ()), batch_size=1000)
+            rows += len(built.get(model, ()))
+        watermark.high_water = bounds["last"]
+        watermark.last_order_id = bounds["last_id"]
+        watermark.save(update_fields=["high_water", "last_order_id", "updated_at"])
+    return {
+        "from": since, "late_days": sorted(late_days), "high_water": bounds["last"], "rows": rows,
+    }
+
+
+def _product_labels(keys):
+    return {pk: name for pk, name in Product.objects.filter(pk__in=keys).values_list("pk", "name")}
+
+
+def _customer_labels(keys):
+    customers = Customer.objects.filter(pk__in=keys).values_list("pk", "name", "email")
+    return {pk: name or email for pk, name, email in customers}
+
+
+# group_by -> (rollup model, key column, labeller)
+GROUPINGS = {
+    "day": (DailyStatusSales, "day", None),
+    "product": (DailyProductSales, "product_id", _product_labels),
+    "customer": (DailyCustomerSales, "customer_id", _customer_labels),
+    "status": (DailyStatusSales, "status", None),
+}
+
+
+def sales_analytics(group_by, date_from, date_to, limit=None):
+    """Totals per ``group_by`` key for ``date_from..date_to`` (inclusive), from the rollups.
+
+    Days come back in date order, other groupings by revenue (highest first).
+    Returns dicts with key, label, orders, units and revenue.
+    """
+    model, key, labeller = GROUPINGS[group_by]
+    rows = (
+        model.objects.filter(day__range=(date_from, date_to))
+        .values(key)
+        .annotate(orders=Sum("orders"), units=Sum("units"), revenue=Sum("revenue"))
+        .order_by(key if group_by == "day" else "-revenue", key)
+    )
+    if limit is not None:
+        rows = rows[:limit]
+    rows = list(rows)
+    # Names are looked up by pk rather than joined, so rollups of deleted rows still show
+    labels = labeller([row[key] for row in rows]) if labeller else {}
+    return [
+        {
+            "key": str(row[key]),
+            "label": labels.get(row[key], str(row[key])),
+            "orders": row["orders"],
+            "units": row["units"],
+            "revenue": (row["revenue"] or Decimal("0")).quantize(CENT),
+        }
+        for row in rows
+    ]
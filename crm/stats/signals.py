@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+from crm.orders.signals import order_totals_shifted
+from .models import DashboardCounter
+
+
+@receiver(post_save, sender=Customer)
+def customer_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        DashboardCounter.objects.bump(DashboardCounter.CUSTOMERS, 1)
+
+
+@receiver(post_delete, sender=Customer)
+def customer_deleted(sender, instance, **kwargs):
+    DashboardCounter.objects.bump(DashboardCounter.CUSTOMERS, -1)
+
+
+@receiver(pre_save, sender=Order)
+def order_saving(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Remember the stored total of an existing order so post_save can apply the delta
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and "total_amount" not in update_fields:
+        return
+    instance._stats_previous_total = (
+        Order.objects.filter(pk=instance.pk).values_list("total_amount", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        DashboardCounter.objects.bump(DashboardCounter.ORDERS, 1)
+        DashboardCounter.objects.bump(DashboardCounter.REVENUE, instance.total_amount)
+        return
+    previous = instance.__dict__.pop("_stats_previous_total", None)
+    if previous is not None:
+        DashboardCounter.objects.bump(DashboardCounter.REVENUE, instance.total_amount - previous)
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    DashboardCounter.objects.bump(DashboardCounter.ORDERS, -1)
+    DashboardCounter.objects.bump(DashboardCounter.REVENUE, -instance.total_amount)
+
+
+@receiver(order_totals_shifted)
+def order_totals_changed(sender, order_count, delta, **kwargs):
+    DashboardCounter.objects.bump(DashboardCounter.REVENUE, delta * order_count)
@@ -1,32 +1,51 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from celery import shared_task
-from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
+
+from crm.db_routing import replica_reads
+from crm.jobs import execute_job_query
+from crm.reports import build_report, write_report
 
 
 @shared_task(name='crm.tasks.generate_crm_report')
 def generate_crm_report():
-    transport = RequestsHTTPTransport(url="http://localhost:8000/graphql", verify=False)
-    client = Client(transport=transport, fetch_schema_from_transport=False)
-
-    query = gql(
-        """
-        query CRMReport {
-          customersCount
-          ordersCount
-          ordersRevenue
-        }
-        """
-    )
+    query = """
+    query CRMReport($from: Date!, $to: Date!) {
+      customersCount
+      ordersCount
+      ordersRevenue
+      salesAnalytics(groupBy: STATUS, from: $from, to: $to) { label orders revenue }
+    }
+    """
+    today = date.today()
+    # Last seven full days, read from the daily rollups
+    variables = {"from": str(today - timedelta(days=7)), "to": str(today - timedelta(days=1))}
 
+    week = ""
     try:
-        data = client.execute(query)
+        data = execute_job_query(query, variables)
         customers_count = data.get('customersCount', 0)
         orders_count = data.get('ordersCount', 0)
         revenue = data.get('ordersRevenue', 0)
+        week = ", ".join(
+            f"{row['label']} {row['orders']} orders/{row['revenue']}"
+            for row in data.get('salesAnalytics') or []
+        )
     except Exception as e:
         customers_count = orders_count = revenue = f"error: {e}"
 
     ts = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
     with open('/tmp/crm_report_log.txt', 'a') as f:
         f.write(f"{ts} - Report: {customers_count} customers, {orders_count} orders, {revenue} revenue\n")
+        if week:
+            period = f"{variables['from']}..{variables['to']}"
+            f.write(f"{ts} - Last week by status ({period}): {week}\n")
+
+    # Full history up to yesterday, streamed in columnar chunks
+    try:
+        with replica_reads():
+            report = build_report(date_to=today - timedelta(days=1))
+        line = f"Detailed report ({report['orders']['count']} orders): {write_report(report)}"
+    except Exception as e:
+        line = f"Detailed report error: {e}"
+    with open('/tmp/crm_report_log.txt', 'a') as f:
+        f.write(f"{ts} - {line}\n")
@@ -0,0 +1,35 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+from django.urls import resolve
+
+from crm.async_resolvers import run_in_pool
+from crm.views import CachedGraphQLView
+
+
+class ResolverPoolTests(SimpleTestCase):
+    def run_task(self, func):
+        async def run():
+            return await run_in_pool(func)
+
+        with mock.patch("crm.async_resolvers.close_old_connections") as close:
+            try:
+                return async_to_sync(run)()
+            finally:
+                self.assertEqual(close.call_count, 2)
+
+    def test_connections_are_recycled_around_each_task(self):
+        self.assertEqual(self.run_task(lambda: 42), 42)
+
+    def test_also_when_the_task_fails(self):
+        def fail():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            self.run_task(fail)
+
+
+class EntryPointTests(SimpleTestCase):
+    def test_wsgi_serves_the_sync_view(self):
+        self.assertIs(resolve("/graphql").func.view_class, CachedGraphQLView)
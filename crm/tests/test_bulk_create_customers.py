@@ -0,0 +1,51 @@
+import json
+
+from django.test import TestCase
+
+from crm.customers.models import Customer
+
+BULK = """
+mutation($customers: [JSONString!]!) {
+  bulkCreateCustomers(customers: $customers) { created { email } errors success }
+}
+"""
+
+
+class BulkCreateCustomersTests(TestCase):
+    def bulk_create(self, *emails):
+        customers = [json.dumps({"name": "X", "email": email}) for email in emails]
+        response = self.client.post(
+            "/graphql",
+            json.dumps({"query": BULK, "variables": {"customers": customers}}),
+            content_type="application/json",
+        )
+        return response.json()["data"]["bulkCreateCustomers"]
+
+    def test_duplicates_within_the_batch_ignore_case(self):
+        result = self.bulk_create("Ann@x.com", "ann@X.COM")
+        self.assertEqual(result["created"], [{"email": "Ann@x.com"}])
+        self.assertEqual(
+            result["errors"], ["Index 1: Duplicate email in batch (index 0): ann@X.COM"]
+        )
+
+    def test_existing_emails_ignore_case(self):
+        Customer.objects.create(name="Ann", email="ANN@x.com")
+        result = self.bulk_create("ann@X.com", "bob@x.com")
+        self.assertEqual(result["created"], [{"email": "bob@x.com"}])
+        self.assertEqual(result["errors"], ["Index 0: Email already exists: ann@X.com"])
+
+    def test_non_ascii_duplicate_is_reported(self):
+        Customer.objects.create(name="Émile", email="Émile@x.com")
+        result = self.bulk_create("Émile@x.com", "zoë@x.com")
+        self.assertEqual(result["created"], [{"email": "zoë@x.com"}])
+        self.assertEqual(result["errors"], ["Index 0: Email already exists: Émile@x.com"])
+        self.assertEqual(Customer.objects.filter(email="Émile@x.com").count(), 1)
+
+    def test_create_customer_ignores_case(self):
+        Customer.objects.create(name="Ann", email="ANN@x.com")
+        query = 'mutation { createCustomer(name: "Ann", email: "ann@X.com") { success errors } }'
+        response = self.client.post(
+            "/graphql", json.dumps({"query": query}), content_type="application/json"
+        )
+        result = response.json()["data"]["createCustomer"]
+        self.assertEqual(result, {"success": False, "errors": ["Email already exists"]})
@@ -0,0 +1,98 @@
+import json
+from decimal import Decimal
+from unittest import mock
+
+from django.db.models import QuerySet
+from django.test import TestCase
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+from crm.products.models import Product
+from crm.stats.models import DashboardCounter
+
+BULK = """
+mutation($orders: [OrderInput!]!) {
+  bulkCreateOrders(orders: $orders) {
+    created { id totalAmount products { id } } errors success
+  }
+}
+"""
+
+
+class BulkCreateOrdersTests(TestCase):
+    def setUp(self):
+        self.ann = Customer.objects.create(name="Ann", email="ann@x.com")
+        self.pen = Product.objects.create(name="Pen", price=Decimal("2.00"), stock=10)
+        self.ink = Product.objects.create(name="Ink", price=Decimal("5.50"), stock=2)
+        DashboardCounter.objects.reconcile()
+
+    def bulk_create(self, *orders):
+        orders = [
+            {"customerId": customer, "productIds": products} for customer, products in orders
+        ]
+        response = self.client.post(
+            "/graphql",
+            json.dumps({"query": BULK, "variables": {"orders": orders}}),
+            content_type="application/json",
+        )
+        return response.json()["data"]["bulkCreateOrders"]
+
+    def test_mixed_valid_and_invalid_rows(self):
+        result = self.bulk_create(
+            (self.ann.pk, [self.pen.pk, self.ink.pk]),
+            ("abc", [self.pen.pk]),
+            (0, [self.pen.pk]),
+            (self.ann.pk, [self.pen.pk, 0]),
+            (self.ann.pk, []),
+            (self.ann.pk, [self.pen.pk, self.pen.pk]),
+        )
+        self.assertFalse(result["success"])
+        self.assertEqual(result["errors"], [
+            "Index 1: Invalid customer or product ID",
+            "Index 2: Customer not found",
+            "Index 3: Products not found: 0",
+            "Index 4: At least one product is required",
+        ])
+        self.assertEqual(
+            [(o["totalAmount"], len(o["products"])) for o in result["created"]],
+            [("7.50", 2), ("2.00", 1)],
+        )
+        self.assertEqual(Order.objects.count(), 2)
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.stock, 8)
+
+    def test_stock_runs_out_partway_through_the_batch(self):
+        result = self.bulk_create(*[(self.ann.pk, [self.pen.pk, self.ink.pk])] * 3)
+        self.assertEqual(len(result["created"]), 2)
+        self.assertEqual(
+            result["errors"], [f"Index 2: Insufficient stock for products: {self.ink.pk}"]
+        )
+        # The rejected row takes nothing, not even the pen it could have had
+        self.pen.refresh_from_db()
+        self.ink.refresh_from_db()
+        self.assertEqual((self.pen.stock, self.ink.stock), (8, 0))
+
+    def test_counters_match_a_recount(self):
+        self.bulk_create(
+            (self.ann.pk, [self.pen.pk, self.ink.pk]),
+            (self.ann.pk, [self.pen.pk]),
+            (0, [self.pen.pk]),
+        )
+        stored = {name: DashboardCounter.objects.read(name) for name in DashboardCounter.LIVE}
+        self.assertEqual(stored, DashboardCounter.objects.reconcile())
+        self.assertEqual(stored[DashboardCounter.ORDERS], 2)
+        self.assertEqual(stored[DashboardCounter.REVENUE], Decimal("9.50"))
+
+    def test_products_are_locked_while_stock_is_checked(self):
+        locked = []
+        in_bulk = QuerySet.in_bulk
+
+        def record(queryset, *args, **kwargs):
+            if queryset.model is Product:
+                locked.append(queryset.query.select_for_update)
+            return in_bulk(queryset, *args, **kwargs)
+
+        # SQLite drops FOR UPDATE from the SQL, so look at the query instead
+        with mock.patch.object(QuerySet, "in_bulk", autospec=True, side_effect=record):
+            self.bulk_create((self.ann.pk, [self.pen.pk]))
+        self.assertEqual(locked, [True])
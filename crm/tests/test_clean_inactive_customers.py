@@ -0,0 +1,55 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from crm.customers.models import Customer
+from crm.orders.models import Order, OrderReminder
+from crm.products.models import Product
+from crm.stats.models import DashboardCounter
+
+
+class CleanInactiveCustomersTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        pen = Product.objects.create(name="Pen", price=Decimal("2.00"))
+        self.inactive = [Customer.objects.create(email=f"old{i}@x.com") for i in range(3)]
+        for customer in self.inactive:
+            order = Order.objects.create(customer=customer, order_date=now - timedelta(days=400))
+            order.products.add(pen)
+            OrderReminder.objects.create(order=order, customer=customer, sent_at=now)
+        self.active = Customer.objects.create(email="new@x.com")
+        order = Order.objects.create(customer=self.active, order_date=now)
+        order.products.add(pen)
+        self.idle = Customer.objects.create(email="idle@x.com")
+        DashboardCounter.objects.reconcile()
+
+    def clean(self, *args):
+        out = StringIO()
+        call_command("clean_inactive_customers", "--log-file", "", *args, stdout=out)
+        return out.getvalue()
+
+    def test_deletes_inactive_customers_and_their_rows(self):
+        output = self.clean("--batch-size", "2")
+        self.assertIn("Deleted customers: 4 (3 orders) in 2 batches", output)
+        self.assertEqual(list(Customer.objects.all()), [self.active])
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Order.products.through.objects.count(), 1)
+        self.assertFalse(OrderReminder.objects.exists())
+
+    def test_counters_stay_exact(self):
+        self.clean()
+        for name in DashboardCounter.LIVE:
+            self.assertEqual(
+                DashboardCounter.objects.read(name),
+                DashboardCounter.objects.compute(name),
+                name,
+            )
+
+    def test_dry_run_deletes_nothing(self):
+        output = self.clean("--dry-run")
+        self.assertIn("Would delete customers: 4 (3 orders)", output)
+        self.assertEqual(Customer.objects.count(), 5)
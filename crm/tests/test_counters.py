@@ -0,0 +1,94 @@
+import json
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+from crm.products.models import Product
+from crm.stats.models import DashboardCounter
+
+
+class OrderTotalTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(email="ann@x.com")
+        self.pen = Product.objects.create(name="Pen", price=Decimal("2.00"))
+        self.ink = Product.objects.create(name="Ink", price=Decimal("5.50"))
+        self.order = Order.objects.create(customer=self.customer, order_date=timezone.now())
+
+    def assertStoredTotal(self, expected):
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_amount, Decimal(expected))
+        self.assertEqual(self.order.calculate_total(), Decimal(expected))
+
+    def test_add_remove_clear(self):
+        self.order.products.add(self.pen, self.ink)
+        self.assertStoredTotal("7.50")
+        self.order.products.remove(self.pen)
+        self.assertStoredTotal("5.50")
+        self.order.products.clear()
+        self.assertStoredTotal("0")
+
+    def test_changes_from_the_product_side(self):
+        self.pen.orders.add(self.order)
+        self.assertStoredTotal("2.00")
+        self.ink.orders.add(self.order)
+        self.ink.orders.clear()
+        self.assertStoredTotal("2.00")
+
+
+class CounterDriftTests(TestCase):
+    def setUp(self):
+        DashboardCounter.objects.reconcile()
+
+    def assertNoDrift(self):
+        for name in DashboardCounter.LIVE:
+            self.assertEqual(
+                DashboardCounter.objects.read(name), DashboardCounter.objects.compute(name), name
+            )
+
+    def graphql(self, query, **variables):
+        response = self.client.post(
+            "/graphql",
+            json.dumps({"query": query, "variables": variables}),
+            content_type="application/json",
+        )
+        body = response.json()
+        self.assertNotIn("errors", body)
+        return body["data"]
+
+    def test_model_changes(self):
+        customer = Customer.objects.create(email="ann@x.com")
+        pen = Product.objects.create(name="Pen", price=Decimal("2.00"))
+        ink = Product.objects.create(name="Ink", price=Decimal("5.50"))
+        order = Order.objects.create(customer=customer, order_date=timezone.now())
+        order.products.add(pen, ink)
+        self.assertNoDrift()
+        order.products.remove(ink)
+        ink.orders.add(order)
+        self.assertNoDrift()
+        order.delete()
+        Customer.objects.create(email="bob@x.com")
+        customer.delete()
+        self.assertNoDrift()
+
+    def test_mutations(self):
+        pen = Product.objects.create(name="Pen", stock=10, price=Decimal("2.00"))
+        created = self.graphql(
+            "mutation($c: [JSONString!]!) { bulkCreateCustomers(customers: $c) { success } }",
+            c=[json.dumps({"name": n, "email": f"{n}@x.com"}) for n in ("ann", "bob")],
+        )
+        self.assertTrue(created["bulkCreateCustomers"]["success"])
+        customer = Customer.objects.get(email="ann@x.com")
+        self.graphql(
+            "mutation($c: ID!, $p: [ID!]!) "
+            "{ createOrder(customerId: $c, productIds: $p) { success } }",
+            c=customer.pk, p=[pen.pk],
+        )
+        self.graphql(
+            "mutation($o: [OrderInput!]!) { bulkCreateOrders(orders: $o) { success } }",
+            o=[{"customerId": customer.pk, "productIds": [pen.pk]}] * 3,
+        )
+        self.assertEqual(Order.objects.count(), 4)
+        self.assertNoDrift()
@@ -0,0 +1,142 @@
+import json
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from crm.customers.models import Customer
+from crm.db_routing import (
+    STICKY_COOKIE,
+    PrimaryReplicaRouter,
+    ReplicaRoutingMiddleware,
+    replica_health,
+    replica_reads,
+)
+from crm.response_cache import invalidate, response_cache
+
+REPLICAS = {"PRIMARY": "default", "REPLICAS": ["replica1"], "STICKY_SECONDS": 10}
+
+
+class MiddlewareChainTests(SimpleTestCase):
+    @override_settings(DEBUG=True)
+    def test_asgi_chain_is_not_adapted_to_sync(self):
+        # With DEBUG on, Django logs "Synchronous handler adapted for middleware ..."
+        # when it has to put a sync-only middleware on a thread
+        with self.assertNoLogs("django.request", level="DEBUG"):
+            ASGIHandler()
+
+
+@override_settings(DATABASE_ROUTING=REPLICAS)
+class RouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        patcher = mock.patch.object(replica_health, "is_healthy", return_value=True)
+        self.is_healthy = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reads_outside_a_scope_use_the_primary(self):
+        self.assertEqual(self.router.db_for_read(Customer), "default")
+
+    def test_reads_in_a_scope_use_a_replica_until_a_write(self):
+        with replica_reads() as state:
+            self.assertEqual(self.router.db_for_read(Customer), "replica1")
+            self.assertEqual(self.router.db_for_write(Customer), "default")
+            self.assertTrue(state.wrote)
+            self.assertEqual(self.router.db_for_read(Customer), "default")
+
+    def test_pinned_scope_reads_the_primary(self):
+        with replica_reads(primary=True) as state:
+            self.assertEqual(self.router.db_for_read(Customer), "default")
+            self.assertFalse(state.wrote)
+
+    def test_reads_in_a_primary_transaction_use_the_primary(self):
+        with replica_reads(), mock.patch.object(connections["default"], "in_atomic_block", True):
+            self.assertEqual(self.router.db_for_read(Customer), "default")
+
+    def test_unhealthy_replicas_fall_back_to_the_primary(self):
+        self.is_healthy.return_value = False
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Customer), "default")
+
+    def test_related_reads_follow_the_instance(self):
+        customer = Customer(pk=1)
+        customer._state.db = "default"
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Customer, instance=customer), "default")
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate("replica1", "customers"))
+        self.assertTrue(self.router.allow_migrate("default", "customers"))
+
+
+@override_settings(DATABASE_ROUTING=REPLICAS)
+class StickinessTests(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        patcher = mock.patch.object(replica_health, "is_healthy", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.reads = []
+
+    def view(self, write):
+        def get_response(request):
+            if write:
+                self.router.db_for_write(Customer)
+            self.reads.append(self.router.db_for_read(Customer))
+            return HttpResponse()
+        return get_response
+
+    def test_write_sets_cookie_and_later_requests_read_the_primary(self):
+        request = RequestFactory().post("/graphql")
+        response = ReplicaRoutingMiddleware(self.view(write=True))(request)
+        self.assertEqual(response.cookies[STICKY_COOKIE]["max-age"], 10)
+
+        request = RequestFactory().get("/graphql")
+        request.COOKIES[STICKY_COOKIE] = "1"
+        response = ReplicaRoutingMiddleware(self.view(write=False))(request)
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.reads, ["default", "default"])
+
+    def test_read_only_request_uses_replica_without_cookie(self):
+        response = ReplicaRoutingMiddleware(self.view(write=False))(RequestFactory().get("/"))
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.reads, ["replica1"])
+
+
+class MutationStickinessTests(TestCase):
+    def post(self, query):
+        return self.client.post(
+            "/graphql", json.dumps({"query": query}), content_type="application/json"
+        )
+
+    def test_mutation_sets_the_sticky_cookie(self):
+        response = self.post(
+            'mutation { createCustomer(name: "Ann", email: "ann@x.com") { message } }'
+        )
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+    def test_query_does_not(self):
+        response = self.post("{ allCustomers { edges { node { name } } } }")
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+
+
+@override_settings(DATABASE_ROUTING=REPLICAS)
+class ResponseCacheFillTests(TestCase):
+    def setUp(self):
+        caches["graphql"].clear()
+
+    def test_replica_results_are_not_cached_right_after_a_write(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate("Customer")
+        with replica_reads() as state:
+            state.replica = "replica1"
+            response_cache.set("from-replica", {"x": 1}, {"Customer"})
+            response_cache.set("untouched-tag", {"x": 1}, {"Product"})
+        with replica_reads(primary=True):
+            response_cache.set("from-primary", {"x": 1}, {"Customer"})
+        self.assertIsNone(response_cache.get("from-replica"))
+        self.assertIsNotNone(response_cache.get("untouched-tag"))
+        self.assertIsNotNone(response_cache.get("from-primary"))
@@ -0,0 +1,86 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+
+from crm.customers.models import Customer
+from crm.documents import persisted_queries, query_hash
+from crm.instrumentation import OTHER, QueryMetricsMiddleware, operation_labels
+
+QUERY = "query Names { allCustomers(first: 5) { edges { node { name } } } }"
+
+
+class QueryMetricsMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Customer.objects.create(name="Ada", email="ada@example.com")
+
+    def setUp(self):
+        # A cached response would run no resolvers and no SQL
+        caches["graphql"].clear()
+
+    def test_async_capable(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(QueryMetricsMiddleware(get_response)))
+        self.assertFalse(iscoroutinefunction(QueryMetricsMiddleware(lambda request: None)))
+
+    def test_counts_queries_of_sync_request(self):
+        response = self.client.post(
+            "/graphql", {"query": QUERY}, content_type="application/json",
+            HTTP_X_GRAPHQL_DEBUG="1",
+        )
+        metrics = response.json()["extensions"]["metrics"]
+        self.assertEqual(metrics["operation"], "Names")
+        self.assertGreater(metrics["queries"], 0)
+
+    async def test_counts_queries_of_async_request(self):
+        response = await self.async_client.post(
+            "/graphql", {"query": QUERY}, content_type="application/json",
+            headers={"X-GraphQL-Debug": "1"},
+        )
+        metrics = response.json()["extensions"]["metrics"]
+        self.assertEqual(metrics["operation"], "Names")
+        self.assertGreater(metrics["queries"], 0)
+
+
+class OperationLabelTests(TestCase):
+    def setUp(self):
+        operation_labels.reset()
+        self.addCleanup(operation_labels.reset)
+        self.addCleanup(persisted_queries.reload)
+
+    @override_settings(GRAPHQL_METRICS_MAX_OPERATIONS=2)
+    def test_names_past_the_limit_are_other(self):
+        persisted_queries.reload()
+        known = "query Known { hello }"
+        persisted_queries._allowlist = {query_hash(known): known}
+        self.assertEqual(operation_labels.label("A"), "A")
+        self.assertEqual(operation_labels.label("B"), "B")
+        self.assertEqual(operation_labels.label("C"), OTHER)
+        self.assertEqual(operation_labels.label("A"), "A")
+        self.assertEqual(operation_labels.label("Known"), "Known")
+        self.assertEqual(operation_labels.label("anonymous"), "anonymous")
+
+
+class MetricsViewTests(TestCase):
+    def test_anonymous_caller_forbidden(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+    def test_staff_user_allowed(self):
+        user = User.objects.create_user("ops", password="x", is_staff=True)
+        self.client.force_login(user)
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_token(self):
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(INTERNAL_IPS=["127.0.0.1"])
+    def test_internal_ip(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
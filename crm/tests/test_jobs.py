@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+
+from crm import jobs
+from crm.customers.models import Customer
+from crm.jobs import JobQueryError, execute_job_query
+
+
+class ExecuteJobQueryTests(TestCase):
+    def test_in_process(self):
+        Customer.objects.create(email="ann@x.com")
+        with mock.patch.object(jobs, "_execute_over_http") as http:
+            data = execute_job_query(
+                "query($first: Int) { allCustomers(first: $first) { edges { node { email } } } }",
+                {"first": 1},
+            )
+        self.assertEqual(data, {"allCustomers": {"edges": [{"node": {"email": "ann@x.com"}}]}})
+        http.assert_not_called()
+
+    def test_graphql_errors_are_raised_not_retried(self):
+        with mock.patch.object(jobs, "_execute_over_http") as http:
+            with self.assertRaises(JobQueryError) as raised:
+                execute_job_query("query { noSuchField }")
+        self.assertIn("noSuchField", str(raised.exception))
+        http.assert_not_called()
+
+    def test_falls_back_to_http_when_in_process_fails(self):
+        failing = mock.patch("crm.schema.schema.execute", side_effect=DatabaseError("no database"))
+        http = mock.patch.object(jobs, "_execute_over_http", return_value={"hello": "hi"})
+        with failing, http as over_http, self.assertLogs("crm.jobs", "WARNING"):
+            self.assertEqual(execute_job_query("query { hello }"), {"hello": "hi"})
+        over_http.assert_called_once_with("query { hello }", None)
+
+    @override_settings(GRAPHQL_JOBS_IN_PROCESS=False)
+    def test_http_only(self):
+        http = mock.patch.object(jobs, "_execute_over_http", return_value={"hello": "hi"})
+        with mock.patch.object(jobs, "_execute_in_process") as in_process, http:
+            self.assertEqual(execute_job_query("query { hello }"), {"hello": "hi"})
+        in_process.assert_not_called()
@@ -0,0 +1,45 @@
+import json
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.test import TestCase
+from django.utils import timezone
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+from crm.products.models import Product
+
+
+class OrderByTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for name, price in (("Bob", "2.00"), ("Ann", "3.00"), ("Cid", "1.00")):
+            customer = Customer.objects.create(name=name, email=f"{name.lower()}@x.com")
+            Product.objects.create(name=name, price=Decimal(price))
+            Order.objects.create(customer=customer, order_date=now, total_amount=Decimal(price))
+
+    def setUp(self):
+        caches["graphql"].clear()
+
+    def names(self, field, order_by, node="name"):
+        query = '{ %s(orderBy: "%s") { edges { node { %s } } } }' % (field, order_by, node)
+        response = self.client.post(
+            "/graphql", json.dumps({"query": query}), content_type="application/json"
+        )
+        body = response.json()
+        self.assertNotIn("errors", body)
+        return [edge["node"][node] for edge in body["data"][field]["edges"]]
+
+    def test_customers(self):
+        self.assertEqual(self.names("allCustomers", "name"), ["Ann", "Bob", "Cid"])
+        self.assertEqual(self.names("allCustomers", "-name"), ["Cid", "Bob", "Ann"])
+
+    def test_products(self):
+        self.assertEqual(self.names("allProducts", "-price"), ["Ann", "Bob", "Cid"])
+        self.assertEqual(self.names("allProducts", "stock,name"), ["Ann", "Bob", "Cid"])
+
+    def test_orders(self):
+        self.assertEqual(
+            self.names("allOrders", "total_amount", "totalAmount"), ["1.00", "2.00", "3.00"]
+        )
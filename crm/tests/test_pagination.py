@@ -0,0 +1,71 @@
+import json
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.test import TestCase
+from django.utils import timezone
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+
+PAGE = """
+query($first: Int, $last: Int, $after: String, $before: String, $orderBy: String) {
+  allOrders(keyset: true, first: $first, last: $last, after: $after, before: $before,
+            orderBy: $orderBy) {
+    edges { node { id totalAmount } }
+    pageInfo { startCursor endCursor hasNextPage hasPreviousPage }
+  }
+}
+"""
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        customer = Customer.objects.create(email="ann@x.com")
+        now = timezone.now()
+        # Repeated totals, so pages must break ties on the pk
+        for amount in ("5", "3", "5", "1", "3", "5", "2"):
+            Order.objects.create(customer=customer, order_date=now, total_amount=Decimal(amount))
+
+    def setUp(self):
+        caches["graphql"].clear()
+
+    def query(self, **variables):
+        response = self.client.post(
+            "/graphql",
+            json.dumps({"query": PAGE, "variables": {"orderBy": "-total_amount", **variables}}),
+            content_type="application/json",
+        )
+        return response.json()
+
+    def page(self, **variables):
+        body = self.query(**variables)
+        self.assertNotIn("errors", body)
+        connection = body["data"]["allOrders"]
+        return [edge["node"]["id"] for edge in connection["edges"]], connection["pageInfo"]
+
+    def test_forward_pages_cover_the_ordering_once(self):
+        expected, _ = self.page(first=100)
+        seen, after = [], None
+        while True:
+            ids, info = self.page(first=3, after=after)
+            seen += ids
+            if not info["hasNextPage"]:
+                break
+            self.assertEqual(len(ids), 3)
+            after = info["endCursor"]
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 7)
+
+    def test_backward_page(self):
+        expected, _ = self.page(first=100)
+        _, info = self.page(first=5)
+        ids, info = self.page(last=2, before=info["endCursor"])
+        self.assertEqual(ids, expected[2:4])
+        self.assertTrue(info["hasPreviousPage"])
+        self.assertTrue(info["hasNextPage"])
+
+    def test_invalid_cursor(self):
+        body = self.query(first=2, after="bm90LWEtY3Vyc29y")
+        self.assertIn("Invalid keyset cursor", body["errors"][0]["message"])
@@ -0,0 +1,60 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from crm.documents import APQ_CACHE_PREFIX, persisted_queries, query_hash
+
+ALLOWED = "{ hello }"
+OTHER = "{ customersCount }"
+
+
+class PersistedQueryAllowlistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        persisted_queries._allowlist = {query_hash(ALLOWED): ALLOWED}
+        self.addCleanup(persisted_queries.reload)
+
+    def post(self, query=None, digest=None):
+        body = {}
+        if query is not None:
+            body["query"] = query
+        if digest is not None:
+            body["extensions"] = {"persistedQuery": {"version": 1, "sha256Hash": digest}}
+        response = self.client.post("/graphql", json.dumps(body), content_type="application/json")
+        return response.json()
+
+    def error_code(self, body):
+        return body["errors"][0]["extensions"]["code"]
+
+    @override_settings(GRAPHQL_PERSISTED_QUERIES_ONLY=True)
+    def test_query_and_hash_outside_allowlist_rejected(self):
+        body = self.post(OTHER, query_hash(OTHER))
+        self.assertEqual(self.error_code(body), "PERSISTED_QUERY_NOT_ALLOWED")
+        self.assertIsNone(cache.get(APQ_CACHE_PREFIX + query_hash(OTHER)))
+        body = self.post(digest=query_hash(OTHER))
+        self.assertEqual(self.error_code(body), "PERSISTED_QUERY_NOT_ALLOWED")
+
+    @override_settings(GRAPHQL_PERSISTED_QUERIES_ONLY=True)
+    def test_runtime_registration_ignored(self):
+        cache.set(APQ_CACHE_PREFIX + query_hash(OTHER), OTHER, timeout=None)
+        body = self.post(digest=query_hash(OTHER))
+        self.assertEqual(self.error_code(body), "PERSISTED_QUERY_NOT_ALLOWED")
+
+    @override_settings(GRAPHQL_PERSISTED_QUERIES_ONLY=True)
+    def test_allowlisted_query_runs(self):
+        self.assertIn("hello", self.post(digest=query_hash(ALLOWED))["data"])
+        self.assertIn("hello", self.post(ALLOWED, query_hash(ALLOWED))["data"])
+        self.assertIn("hello", self.post(ALLOWED)["data"])
+        body = self.post(OTHER)
+        self.assertEqual(self.error_code(body), "PERSISTED_QUERY_NOT_ALLOWED")
+
+    def test_apq_registers_without_allowlist_only(self):
+        body = self.post(digest=query_hash(OTHER))
+        self.assertEqual(self.error_code(body), "PERSISTED_QUERY_NOT_FOUND")
+        self.assertIn("data", self.post(OTHER, query_hash(OTHER)))
+        self.assertIn("customersCount", self.post(digest=query_hash(OTHER))["data"])
+
+    def test_hash_mismatch(self):
+        body = self.post(OTHER, query_hash(ALLOWED))
+        self.assertEqual(self.error_code(body), "PERSISTED_QUERY_HASH_MISMATCH")
@@ -0,0 +1,74 @@
+import json
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import TestCase
+from graphql import GraphQLError
+
+from crm import phones
+from crm.customers.models import Customer
+from crm.phones import filter_phone
+
+
+class FilterPhoneTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.us = Customer.objects.create(email="us@x.com", phone="555-123-4567")
+        cls.uk = Customer.objects.create(email="uk@x.com", phone="+447700900123")
+        Customer.objects.create(email="none@x.com")
+
+    def matches(self, pattern):
+        return set(filter_phone(Customer.objects.all(), pattern))
+
+    def test_literal_patterns(self):
+        self.assertEqual(self.matches("^555"), {self.us})
+        self.assertEqual(self.matches("+44"), {self.uk})
+        self.assertEqual(self.matches("4567$"), {self.us})
+
+    def test_free_form_pattern_is_matched_in_the_database(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.matches(r"^\d{3}-\d{3}-45"), {self.us})
+        self.assertEqual(self.matches(r"^\+44|^555"), {self.us, self.uk})
+
+    def test_timeout(self):
+        with mock.patch.object(phones, "SCAN_TIMEOUT", -1):
+            with self.assertRaisesMessage(GraphQLError, "took too long"):
+                self.matches(r"\d{4}")
+
+    def test_nested_repetition_is_rejected(self):
+        with self.assertRaisesMessage(GraphQLError, "too complex"):
+            self.matches(r"(\d+)+$")
+
+
+class PhonePatternQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Customer.objects.bulk_create(
+            Customer(email=f"c{i}@x.com", phone=f"555-{i // 100:03d}-{i:04d}") for i in range(600)
+        )
+
+    def setUp(self):
+        caches["graphql"].clear()
+
+    def query(self, pattern):
+        query = (
+            "query($p: String) { allCustomers(phonePattern: $p, first: 5) "
+            "{ totalCount edges { node { phone } } } }"
+        )
+        response = self.client.post(
+            "/graphql", json.dumps({"query": query, "variables": {"p": pattern}}),
+            content_type="application/json",
+        )
+        return response.json()
+
+    def test_pattern_matching_many_customers_is_paginated(self):
+        body = self.query(r"^\d{3}-\d{3}-\d{4}$")
+        self.assertNotIn("errors", body)
+        connection = body["data"]["allCustomers"]
+        self.assertEqual(connection["totalCount"], 600)
+        self.assertEqual(len(connection["edges"]), 5)
+
+    def test_timeout_applies_when_the_connection_is_evaluated(self):
+        with mock.patch.object(phones, "SCAN_TIMEOUT", -1):
+            body = self.query(r"^\d{3}-\d{3}-\d{4}$")
+        self.assertIn("took too long", body["errors"][0]["message"])
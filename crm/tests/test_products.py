@@ -0,0 +1,110 @@
+import json
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from crm.customers.models import Customer
+from crm.db_routing import replica_health, replica_reads
+from crm.orders.models import Order
+from crm.products.models import InsufficientStock, Product
+
+REPLICAS = {"PRIMARY": "default", "REPLICAS": ["replica1"], "STICKY_SECONDS": 10}
+
+
+@override_settings(DATABASE_ROUTING=REPLICAS)
+class StockWritesUsePrimaryTests(TransactionTestCase):
+    # Not TestCase: inside its transaction every read goes to the primary anyway.
+    # "replica1" is not a configured connection, so touching it raises
+
+    def setUp(self):
+        patcher = mock.patch.object(replica_health, "is_healthy", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.low = Product.objects.create(name="Low", stock=1)
+        self.full = Product.objects.create(name="Full", stock=50)
+
+    def test_restock_below_in_a_replica_scope(self):
+        with replica_reads() as state:
+            restocked = Product.objects.restock_below(5, 10)
+        self.assertEqual([(p.pk, p.stock) for p in restocked], [(self.low.pk, 11)])
+        self.assertEqual(restocked[0]._state.db, "default")
+        self.assertTrue(state.wrote)
+
+    def test_restock_below_without_returning_in_a_replica_scope(self):
+        with mock.patch("crm.products.models._supports_update_returning", return_value=False):
+            with replica_reads():
+                restocked = Product.objects.restock_below(5, 10)
+        self.assertEqual([(p.pk, p.stock) for p in restocked], [(self.low.pk, 11)])
+
+    def test_reserve_in_a_replica_scope(self):
+        with replica_reads() as state:
+            Product.objects.reserve([self.full.pk], quantity=5)
+        self.full.refresh_from_db()
+        self.assertEqual(self.full.stock, 45)
+        self.assertTrue(state.wrote)
+
+
+class ReserveTests(TestCase):
+    def setUp(self):
+        self.last = Product.objects.create(name="Last", stock=1)
+        self.plenty = Product.objects.create(name="Plenty", stock=10)
+
+    def test_reserve_never_oversells(self):
+        Product.objects.reserve([self.last.pk])
+        with self.assertRaises(InsufficientStock) as raised:
+            Product.objects.reserve([self.last.pk])
+        self.assertEqual(raised.exception.short, [self.last.pk])
+        self.last.refresh_from_db()
+        self.assertEqual(self.last.stock, 0)
+
+    def test_short_product_rolls_back_the_others(self):
+        with self.assertRaises(InsufficientStock) as raised:
+            Product.objects.reserve([self.plenty.pk, self.last.pk], quantity=2)
+        self.assertEqual(raised.exception.short, [self.last.pk])
+        self.plenty.refresh_from_db()
+        self.assertEqual(self.plenty.stock, 10)
+
+    def test_missing_product(self):
+        with self.assertRaises(InsufficientStock) as raised:
+            Product.objects.reserve([self.plenty.pk, 0])
+        self.assertEqual(raised.exception.missing, [0])
+        self.plenty.refresh_from_db()
+        self.assertEqual(self.plenty.stock, 10)
+
+    def test_create_order_for_the_last_unit_succeeds_once(self):
+        customer = Customer.objects.create(name="Ann", email="ann@x.com")
+        query = (
+            "mutation($c: ID!, $p: [ID!]!) "
+            "{ createOrder(customerId: $c, productIds: $p) { success errors } }"
+        )
+        variables = {"c": customer.pk, "p": [self.last.pk]}
+        results = [
+            self.client.post(
+                "/graphql", json.dumps({"query": query, "variables": variables}),
+                content_type="application/json",
+            ).json()["data"]["createOrder"]
+            for _ in range(2)
+        ]
+        self.assertEqual([r["success"] for r in results], [True, False])
+        self.assertEqual(results[1]["errors"], [f"Insufficient stock for products: {self.last.pk}"])
+        self.assertEqual(Order.objects.count(), 1)
+        self.last.refresh_from_db()
+        self.assertEqual(self.last.stock, 0)
+
+    def test_create_order_with_an_invalid_id(self):
+        customer = Customer.objects.create(name="Ann", email="ann@x.com")
+        query = (
+            "mutation($c: ID!, $p: [ID!]!) "
+            "{ createOrder(customerId: $c, productIds: $p) { success errors } }"
+        )
+        for variables in ({"c": customer.pk, "p": ["abc"]}, {"c": "abc", "p": [self.last.pk]}):
+            with self.subTest(**variables):
+                result = self.client.post(
+                    "/graphql", json.dumps({"query": query, "variables": variables}),
+                    content_type="application/json",
+                ).json()["data"]["createOrder"]
+                self.assertEqual(
+                    result, {"success": False, "errors": ["Invalid customer or product ID"]}
+                )
+        self.last.refresh_from_db()
+        self.assertEqual(self.last.stock, 1)
@@ -0,0 +1,58 @@
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+ORDERS = """
+query($first: Int, $last: Int) {
+  allOrders(first: $first, last: $last) {
+    edges { node { id products { id } } }
+  }
+}
+"""
+
+
+class QueryCostTests(TestCase):
+    def setUp(self):
+        caches["graphql"].clear()
+
+    def post(self, query, **variables):
+        return self.client.post(
+            "/graphql", json.dumps({"query": query, "variables": variables}),
+            content_type="application/json",
+        )
+
+    def assertRejected(self, response, code):
+        self.assertEqual(response.status_code, 400)
+        body = response.json()
+        self.assertNotIn("data", body)
+        self.assertEqual([e["extensions"]["code"] for e in body["errors"]], [code])
+        return body["extensions"]["cost"]
+
+    def test_page_size_over_the_limit(self):
+        for variables in ({"first": 101}, {"last": 101}):
+            with self.subTest(**variables), self.assertNumQueries(0):
+                cost = self.assertRejected(self.post(ORDERS, **variables), "PAGE_SIZE_TOO_LARGE")
+            self.assertEqual(cost["estimatedRows"], 101 + 101 * 5)
+
+    @override_settings(GRAPHQL_QUERY_COST={**settings.GRAPHQL_QUERY_COST, "MAX_COST": 500})
+    def test_cost_over_the_budget(self):
+        with self.assertNumQueries(0):
+            cost = self.assertRejected(self.post(ORDERS, first=100), "QUERY_TOO_COMPLEX")
+        self.assertEqual(
+            cost, {"estimatedRows": 100 + 100 * 5, "maxCost": 500, "depth": 5, "maxDepth": 12}
+        )
+
+    @override_settings(GRAPHQL_QUERY_COST={**settings.GRAPHQL_QUERY_COST, "MAX_DEPTH": 4})
+    def test_depth_over_the_limit(self):
+        with self.assertNumQueries(0):
+            cost = self.assertRejected(self.post(ORDERS, first=1), "QUERY_TOO_DEEP")
+        self.assertEqual((cost["depth"], cost["maxDepth"]), (5, 4))
+
+    def test_within_budget_runs_and_reports_its_cost(self):
+        response = self.post(ORDERS, first=2)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["data"], {"allOrders": {"edges": []}})
+        self.assertEqual(body["extensions"]["cost"]["estimatedRows"], 2 + 2 * 5)
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+from django.utils import timezone
+
+from crm.customers.models import Customer
+from crm.orders.models import Order, OrderReminder
+from crm.reminders import LocalSender, dispatch, record_sent, reminders
+
+
+class ReminderPipelineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.ann = Customer.objects.create(name="Ann", email="ann@x.com")
+        cls.bob = Customer.objects.create(name="Bob", email="bob@x.com")
+        cls.ann_orders = [
+            Order.objects.create(customer=cls.ann, order_date=now - timedelta(days=d)).pk
+            for d in (1, 2, 3)
+        ]
+        cls.bob_orders = [Order.objects.create(customer=cls.bob, order_date=now).pk]
+        # Not due: too old, or no longer pending
+        Order.objects.create(customer=cls.bob, order_date=now - timedelta(days=10))
+        Order.objects.create(customer=cls.bob, order_date=now, status="shipped")
+
+    async def run_pipeline(self, sender):
+        # A small page size, so Ann's orders span several pages
+        return await dispatch(sender, batch_size=2, concurrency=2)
+
+    def reminded(self):
+        return set(OrderReminder.objects.values_list("order_id", flat=True))
+
+    async def test_one_reminder_per_customer(self):
+        sender = LocalSender()
+        stats = await self.run_pipeline(sender)
+        self.assertEqual(stats, {"customers": 2, "orders": 4, "failed": 0})
+        sent = {reminder.email: sorted(reminder.order_ids) for reminder in sender.sent}
+        self.assertEqual(sent, {"ann@x.com": self.ann_orders, "bob@x.com": self.bob_orders})
+        self.assertEqual(
+            await sync_to_async(self.reminded)(), {*self.ann_orders, *self.bob_orders}
+        )
+
+    async def test_rerun_sends_nothing(self):
+        await self.run_pipeline(LocalSender())
+        sender = LocalSender()
+        stats = await self.run_pipeline(sender)
+        self.assertEqual(stats, {"customers": 0, "orders": 0, "failed": 0})
+        self.assertEqual(sender.sent, [])
+
+    async def test_failed_sends_are_retried_on_the_next_run(self):
+        with self.assertLogs("crm.reminders", "ERROR"):
+            stats = await self.run_pipeline(LocalSender(fail_for={"ann@x.com"}))
+        self.assertEqual(stats, {"customers": 1, "orders": 1, "failed": 1})
+        self.assertEqual(await sync_to_async(self.reminded)(), set(self.bob_orders))
+
+        sender = LocalSender()
+        stats = await self.run_pipeline(sender)
+        self.assertEqual(stats, {"customers": 1, "orders": 3, "failed": 0})
+        self.assertEqual([reminder.email for reminder in sender.sent], ["ann@x.com"])
+
+    def test_record_sent_is_idempotent(self):
+        rows = [(pk, self.ann.pk, self.ann.email, self.ann.name) for pk in self.ann_orders]
+        (reminder,) = reminders(rows)
+        record_sent(reminder, timezone.now())
+        record_sent(reminder, timezone.now())
+        self.assertEqual(OrderReminder.objects.count(), 3)
@@ -0,0 +1,65 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+from crm.views import AsyncGraphQLView
+
+
+class AsyncResponseCacheTests(TestCase):
+    def setUp(self):
+        caches["graphql"].clear()
+        self.client.force_login(User.objects.create_user("ann"))
+
+    def request(self):
+        request = RequestFactory().post(
+            "/graphql",
+            json.dumps({"query": "{ allProducts { edges { node { name } } } }"}),
+            content_type="application/json",
+        )
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = self.client.session.session_key
+        # request.user stays a lazy session + user lookup, as in a real request
+        SessionMiddleware(lambda r: None).process_request(request)
+        AuthenticationMiddleware(lambda r: None).process_request(request)
+        return request
+
+    async def test_cache_key_for_a_session_user_on_the_event_loop(self):
+        view = AsyncGraphQLView.as_view()
+        for _ in range(2):
+            response = await view(self.request())
+            body = json.loads(response.content)
+            self.assertNotIn("errors", body)
+            self.assertEqual(body["data"], {"allProducts": {"edges": []}})
+
+
+class ResponseCacheTagTests(TestCase):
+    def setUp(self):
+        caches["graphql"].clear()
+
+    def pending_emails(self):
+        response = self.client.post(
+            "/graphql",
+            json.dumps({"query": "{ pendingOrdersLastWeek { customer { email } } }"}),
+            content_type="application/json",
+        )
+        return [o["customer"]["email"] for o in response.json()["data"]["pendingOrdersLastWeek"]]
+
+    def test_saving_a_customer_invalidates_pending_orders(self):
+        customer = Customer.objects.create(email="ann@x.com")
+        Order.objects.create(customer=customer, order_date=timezone.now())
+        self.assertEqual(self.pending_emails(), ["ann@x.com"])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.pending_emails(), ["ann@x.com"])
+
+        customer.email = "ann@y.com"
+        with self.captureOnCommitCallbacks(execute=True):
+            customer.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.pending_emails(), ["ann@y.com"])
@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from crm.customers.models import Customer
+from crm.orders.models import Order
+from crm.products.models import Product
+from crm.stats.models import DailyProductSales, DailyStatusSales
+from crm.stats.rollups import refresh_sales_rollups, sales_analytics
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create(email="ann@x.com")
+        self.pen = Product.objects.create(name="Pen", price=Decimal("2.00"))
+        self.ink = Product.objects.create(name="Ink", price=Decimal("5.00"))
+        self.order = Order.objects.create(customer=customer, order_date=timezone.now())
+        self.order.products.set([self.pen, self.ink])
+        self.order.calculate_total()
+        self.order.save()
+        self.today = timezone.localdate()
+
+    def analytics(self, group_by):
+        return {
+            row["key"]: row["revenue"]
+            for row in sales_analytics(group_by, self.today, self.today)
+        }
+
+    def test_day_revenue_is_the_stored_order_total(self):
+        Product.objects.filter(pk=self.pen.pk).update(price=Decimal("100.00"))
+        refresh_sales_rollups(rebuild=True)
+        self.assertEqual(self.analytics("day"), {str(self.today): Decimal("7.00")})
+        # Per product: units at the list price of the refresh
+        self.assertEqual(
+            self.analytics("product"),
+            {str(self.pen.pk): Decimal("100.00"), str(self.ink.pk): Decimal("5.00")},
+        )
+
+    def test_refresh_replaces_the_affected_days(self):
+        refresh_sales_rollups()
+        refresh_sales_rollups()
+        refresh_sales_rollups(rebuild=True)
+        self.assertEqual(DailyStatusSales.objects.count(), 1)
+        self.assertEqual(DailyProductSales.objects.count(), 2)
+        self.assertEqual(self.analytics("status"), {self.order.status: Decimal("7.00")})
@@ -0,0 +1,43 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from crm.customers.models import Customer
+from crm.pagination import keyset_connection
+from crm.schema import CustomerNode
+from crm.search import RANK, search
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ann = Customer.objects.create(name="Ann Smith", email="ann@x.com")
+        cls.annie = Customer.objects.create(name="Annie Ann", email="annie@x.com")
+        cls.bob = Customer.objects.create(name="Bob Stone", email="bob@x.com")
+
+    def test_prefix_match_best_first(self):
+        results = list(search(Customer.objects.all(), "ann"))
+        self.assertEqual(set(results), {self.ann, self.annie})
+        ranks = [getattr(customer, RANK) for customer in results]
+        self.assertEqual(ranks, sorted(ranks))
+
+    def test_every_word_must_match(self):
+        self.assertEqual(list(search(Customer.objects.all(), "ann smi")), [self.ann])
+
+    def test_match_runs_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(search(Customer.objects.all(), "ann"))
+        self.assertEqual(queries[0]["sql"].count("MATCH"), 1)
+
+    def test_keyset_pages_over_the_rank(self):
+        queryset = search(Customer.objects.all(), "ann")
+        names = []
+        args = {"first": 1}
+        while True:
+            page = keyset_connection(CustomerNode._meta.connection, queryset, args)
+            names += [edge.node.name for edge in page.edges]
+            if not page.page_info.has_next_page:
+                break
+            args = {"first": 1, "after": page.page_info.end_cursor}
+        self.assertEqual(names, [customer.name for customer in queryset])
+        self.assertEqual(len(names), 2)
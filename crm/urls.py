@@ -1,9 +1,21 @@
+import os
+
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
-from graphene_django.views import GraphQLView
 from django.views.decorators.csrf import csrf_exempt
+from crm.instrumentation import metrics_view
+from crm.views import AsyncGraphQLView, CachedGraphQLView, OrderExportView
+
+graphql_async = settings.GRAPHQL_ASYNC
+if graphql_async is None:
+    # Set by crm/asgi.py only, so WSGI servers and runserver keep the sync view
+    graphql_async = os.environ.get('CRM_GRAPHQL_ASYNC') == '1'
+GraphQLView = AsyncGraphQLView if graphql_async else CachedGraphQLView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('graphql', csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path('graphql/export/orders', OrderExportView.as_view()),
+    path('metrics', metrics_view),
 ]
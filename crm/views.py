@@ -0,0 +1,348 @@
+import json
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.views import View
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.views import GraphQLView, HttpError, set_rollback
+from graphql import ExecutionResult, GraphQLError, OperationType, execute, get_operation_ast
+
+from .async_resolvers import ThreadedResolverMiddleware
+from .db_routing import pin_primary, pinned_to_primary
+from .documents import get_document, persisted_queries, query_hash
+from .exports import csv_lines, filter_orders, iter_orders, ndjson_lines
+from .query_cost import analyze
+from .response_cache import response_cache, user_key
+
+
+def _persisted_query_error(message, code):
+    return ExecutionResult(errors=[GraphQLError(message, extensions={"code": code})])
+
+
+class CachedGraphQLView(GraphQLView):
+    """GraphQLView that reuses parsed/validated documents and speaks APQ.
+
+    Clients may send ``extensions.persistedQuery.sha256Hash`` without a query;
+    unknown hashes answer ``PersistedQueryNotFound`` so the client can resend
+    the full text, which is then registered under its hash.
+    """
+
+    def get_persisted_query(self, request, data):
+        extensions = request.GET.get("extensions") or data.get("extensions") or {}
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("extensions must be valid JSON."))
+        persisted = extensions.get("persistedQuery") if isinstance(extensions, dict) else None
+        return (persisted or {}).get("sha256Hash")
+
+    def prepare_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        """Resolve APQ and parse/validate the (cached) document.
+
+        Returns ``(result, None)`` when the request is answered without executing
+        anything (including operations over the ``GRAPHQL_QUERY_COST`` budget),
+        else ``(None, (document, operation_ast, cost))``.
+        """
+        digest = self.get_persisted_query(request, data)
+        allowlist_only = getattr(settings, "GRAPHQL_PERSISTED_QUERIES_ONLY", False)
+        if digest and query and query_hash(query) != digest:
+            return _persisted_query_error(
+                "provided sha does not match query", "PERSISTED_QUERY_HASH_MISMATCH"
+            ), None
+        if allowlist_only:
+            # Only the build-time allowlist counts: nothing is registered at runtime,
+            # whether the client sends the text, the hash or both
+            if query:
+                digest = query_hash(query)
+            if (query or digest) and digest not in persisted_queries.allowlist:
+                return _persisted_query_error(
+                    "Query is not in the persisted query allowlist", "PERSISTED_QUERY_NOT_ALLOWED"
+                ), None
+            if digest and not query:
+                query = persisted_queries.allowlist[digest]
+        elif digest:
+            if query:
+                persisted_queries.register(digest, query)
+            else:
+                query = persisted_queries.get(digest)
+                if query is None:
+                    return _persisted_query_error(
+                        "PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND"
+                    ), None
+
+        if not query:
+            if show_graphiql:
+                return None, None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        try:
+            document, validation_errors = get_document(
+                self.schema.graphql_schema, query, self.validation_rules, digest=digest
+            )
+        except GraphQLError as e:
+            return ExecutionResult(errors=[e]), None
+        if validation_errors:
+            return ExecutionResult(data=None, errors=validation_errors), None
+
+        operation_ast = get_operation_ast(document, operation_name)
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None, None
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    "Can only perform a {} operation from a POST request.".format(
+                        operation_ast.operation.value
+                    ),
+                )
+            )
+        if operation_ast is None:
+            return None, (document, operation_ast, None)
+        # Rejected before any resolver (and so any SQL) runs
+        cost = analyze(self.schema.graphql_schema, document, operation_ast, variables)
+        if cost.errors:
+            extensions = {"cost": cost.as_extension()}
+            return ExecutionResult(errors=cost.errors, extensions=extensions), None
+        return None, (document, operation_ast, cost)
+
+    @staticmethod
+    def with_cost(result, cost):
+        if cost is not None:
+            result.extensions = {**(result.extensions or {}), "cost": cost.as_extension()}
+        return result
+
+    def format_result(self, execution_result, id=None):
+        """Return ``(response dict, status code)`` for an ExecutionResult."""
+        status_code = 200
+        response = {}
+        if execution_result.errors:
+            response["errors"] = [self.format_error(e) for e in execution_result.errors]
+        if execution_result.errors and any(
+            not getattr(e, "path", None) for e in execution_result.errors
+        ):
+            status_code = 400
+        else:
+            response["data"] = execution_result.data
+        if execution_result.extensions:
+            response["extensions"] = execution_result.extensions
+        if self.batch:
+            response["id"] = id
+            response["status"] = status_code
+        return response, status_code
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+        if not execution_result:
+            return None, 200
+        if execution_result.errors:
+            set_rollback()
+        response, status_code = self.format_result(execution_result, id)
+        return self.json_encode(request, response, pretty=show_graphiql), status_code
+
+    def get_execute_options(self, request, variables, operation_name):
+        options = {
+            "root_value": self.get_root_value(request),
+            "context_value": self.get_context(request),
+            "variable_values": variables,
+            "operation_name": operation_name,
+            "middleware": self.get_middleware(request),
+        }
+        if self.execution_context_class:
+            options["execution_context_class"] = self.execution_context_class
+        return options
+
+    @staticmethod
+    def is_atomic_mutation(operation_ast):
+        return (
+            operation_ast is not None
+            and operation_ast.operation == OperationType.MUTATION
+            and (
+                graphene_settings.ATOMIC_MUTATIONS is True
+                or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+            )
+        )
+
+    def run_graphql_request(self, request, document, operation_ast, variables, operation_name):
+        schema = self.schema.graphql_schema
+        if operation_ast is not None and operation_ast.operation == OperationType.MUTATION:
+            # A mutation's own lookups must not read stale rows from a replica
+            pin_primary()
+        try:
+            execute_options = self.get_execute_options(request, variables, operation_name)
+            if self.is_atomic_mutation(operation_ast):
+                with transaction.atomic():
+                    result = execute(schema, document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            # Read-only queries over opted-in fields are served from the response cache
+            tags = response_cache.tags_for(schema, document, operation_ast)
+            if tags is None:
+                return execute(schema, document, **execute_options)
+            key = response_cache.key(
+                document, operation_name, variables, user_key(request), tags
+            )
+            # Clients reading their own writes skip entries other clients filled from a replica
+            data = None if pinned_to_primary() else response_cache.get(key)
+            if data is not None:
+                return ExecutionResult(data=data)
+            result = execute(schema, document, **execute_options)
+            if not result.errors:
+                response_cache.set(key, result.data, tags)
+            return result
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        result, prepared = self.prepare_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if prepared is None:
+            return result
+        document, operation_ast, cost = prepared
+        result = self.run_graphql_request(
+            request, document, operation_ast, variables, operation_name
+        )
+        return self.with_cost(result, cost)
+
+
+class AsyncGraphQLView(CachedGraphQLView):
+    """CachedGraphQLView for the ASGI entry point.
+
+    Queries run on graphql-core's async executor: sync resolvers that may hit
+    the database run on a bounded thread pool (``ThreadedResolverMiddleware``),
+    counters use native async querysets, and independent fields resolve
+    concurrently instead of holding a thread for the whole request. Mutations
+    keep their serial, transactional execution on a single thread.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            if request.method.lower() not in ("get", "post"):
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ["GET", "POST"], "GraphQL only supports GET and POST requests."
+                    )
+                )
+            data = self.parse_body(request)
+            if self.graphiql and self.can_display_graphiql(request, data):
+                return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+            if self.batch:
+                responses = [await self.aget_response(request, entry) for entry in data]
+                result = "[{}]".format(",".join(response[0] for response in responses))
+                status_code = max((response[1] for response in responses), default=200)
+            else:
+                result, status_code = await self.aget_response(request, data)
+            return HttpResponse(status=status_code, content=result, content_type="application/json")
+        except HttpError as e:
+            response = e.response
+            response["Content-Type"] = "application/json"
+            response.content = self.json_encode(request, {"errors": [self.format_error(e)]})
+            return response
+
+    async def aget_response(self, request, data):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+        execution_result = await self.aexecute_graphql_request(
+            request, data, query, variables, operation_name
+        )
+        response, status_code = self.format_result(execution_result, id)
+        return self.json_encode(request, response), status_code
+
+    async def aexecute_graphql_request(self, request, data, query, variables, operation_name):
+        result, prepared = self.prepare_graphql_request(
+            request, data, query, variables, operation_name
+        )
+        if prepared is None:
+            return result
+        document, operation_ast, cost = prepared
+        result = await self.arun_graphql_request(
+            request, document, operation_ast, variables, operation_name
+        )
+        return self.with_cost(result, cost)
+
+    async def arun_graphql_request(
+        self, request, document, operation_ast, variables, operation_name
+    ):
+        if operation_ast is None or operation_ast.operation != OperationType.QUERY:
+            return await sync_to_async(self.run_graphql_request)(
+                request, document, operation_ast, variables, operation_name
+            )
+
+        schema = self.schema.graphql_schema
+        try:
+            tags = response_cache.tags_for(schema, document, operation_ast)
+            key = None
+            if tags is not None:
+                # request.user is a lazy session/user lookup: resolve it off the event loop
+                user = await sync_to_async(user_key)(request)
+                key = response_cache.key(document, operation_name, variables, user, tags)
+                data = None if pinned_to_primary() else response_cache.get(key)
+                if data is not None:
+                    return ExecutionResult(data=data)
+            execute_options = self.get_execute_options(request, variables, operation_name)
+            execute_options["context_value"].graphql_async = True
+            execute_options["middleware"] = [
+                ThreadedResolverMiddleware(), *(execute_options["middleware"] or ())
+            ]
+            result = execute(schema, document, **execute_options)
+            if isawaitable(result):
+                result = await result
+            if key is not None and not result.errors:
+                response_cache.set(key, result.data, tags)
+            return result
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+
+class OrderExportView(View):
+    """Stream every order matching the ``OrderFilter`` query parameters.
+
+    ``?format=ndjson`` (default) or ``?format=csv``. Rows are fetched with a
+    chunked iterator, so memory stays flat however many orders match.
+    """
+
+    formats = {
+        "ndjson": (ndjson_lines, "application/x-ndjson"),
+        "csv": (csv_lines, "text/csv"),
+    }
+
+    def get(self, request):
+        params = request.GET.copy()
+        fmt = params.pop("format", ["ndjson"])[-1]
+        if fmt not in self.formats:
+            return HttpResponseBadRequest(f"Unknown format {fmt!r}; use ndjson or csv.")
+        queryset, errors = filter_orders(params.dict())
+        if errors:
+            return JsonResponse({"errors": errors}, status=400)
+        render, content_type = self.formats[fmt]
+        response = StreamingHttpResponse(render(iter_orders(queryset)), content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="orders.{fmt}"'
+        return response